@@ -2,7 +2,7 @@
 Configuration de l'admin Django pour les modèles core BasicFit
 """
 from django.contrib import admin
-from .models import ModeEntrainement
+from .models import ModeEntrainement, ReponseIdempotente
 
 
 @admin.register(ModeEntrainement)
@@ -32,4 +32,14 @@ class ModeEntrainementAdmin(admin.ModelAdmin):
         ('Configuration', {
             'fields': ('is_active',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ReponseIdempotente)
+class ReponseIdempotenteAdmin(admin.ModelAdmin):
+    list_display = ['utilisateur', 'cle', 'statut_http', 'created_at', 'expire_le']
+    list_filter = ['statut_http', 'created_at']
+    search_fields = ['cle', 'utilisateur__email']
+    raw_id_fields = ['utilisateur']
+    readonly_fields = ['empreinte', 'statut_http', 'corps', 'created_at']
+    ordering = ['-created_at']
@@ -0,0 +1,83 @@
+"""
+Cache des réponses calculées pour un utilisateur.
+
+Chaque utilisateur a une version de données, changée à chaque écriture de
+ses séances, exercices, séries ou progressions (voir apps/workouts/signals.py).
+Les clés de cache incluent cette version : une écriture rend immédiatement
+obsolètes toutes les réponses en cache de l'utilisateur, sans avoir à les
+énumérer. Les écritures par lots (bulk_create, bulk_update) appellent
+incrementer_version_utilisateur explicitement.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+DUREE_CACHE = 60 * 60
+CLE_SUCCES = 'utilisateur:cache:succes'
+CLE_ECHECS = 'utilisateur:cache:echecs'
+
+
+def _cle_version(utilisateur_id):
+    return f'utilisateur:{utilisateur_id}:version'
+
+
+def version_utilisateur(utilisateur_id):
+    """Retourne la version courante des données de l'utilisateur"""
+    cle = _cle_version(utilisateur_id)
+    version = cache.get(cle)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(cle, version, timeout=None):
+            version = cache.get(cle, version)
+    return version
+
+
+def incrementer_version_utilisateur(utilisateur_id):
+    """
+    Invalide les réponses en cache de l'utilisateur, une fois la transaction
+    en cours validée (une lecture concurrente ne peut donc pas remettre en
+    cache des données antérieures à l'écriture sous la nouvelle version)
+    """
+    if utilisateur_id is None:
+        return
+    transaction.on_commit(
+        lambda: cache.set(_cle_version(utilisateur_id), time.time_ns(), timeout=None)
+    )
+
+
+def _compter(cle):
+    try:
+        cache.incr(cle)
+    except ValueError:
+        cache.add(cle, 0, timeout=None)
+        cache.incr(cle)
+
+
+def en_cache_utilisateur(utilisateur_id, nom, calculer, timeout=DUREE_CACHE):
+    """
+    Retourne la valeur `nom` de l'utilisateur depuis le cache, ou la calcule
+    avec `calculer()` et la met en cache pour la version courante
+    """
+    cle = f'utilisateur:{utilisateur_id}:{version_utilisateur(utilisateur_id)}:{nom}'
+    valeur = cache.get(cle)
+    if valeur is not None:
+        _compter(CLE_SUCCES)
+        return valeur
+
+    _compter(CLE_ECHECS)
+    valeur = calculer()
+    cache.set(cle, valeur, timeout)
+    return valeur
+
+
+def statistiques_cache():
+    """Compteurs de succès et d'échecs du cache utilisateur"""
+    succes = cache.get(CLE_SUCCES, 0)
+    echecs = cache.get(CLE_ECHECS, 0)
+    total = succes + echecs
+    return {
+        'succes': succes,
+        'echecs': echecs,
+        'taux_succes': round(succes / total * 100, 1) if total else 0.0,
+    }
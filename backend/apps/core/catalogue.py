@@ -0,0 +1,30 @@
+"""
+Version du catalogue des modes d'entraînement.
+
+La version change à chaque modification d'un mode (voir signals.py) ;
+elle sert d'ETag à la liste des modes.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CLE_VERSION = 'core:modes:version'
+
+
+def version_modes():
+    """Retourne la version courante des modes d'entraînement"""
+    version = cache.get(CLE_VERSION)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CLE_VERSION, version, timeout=None):
+            version = cache.get(CLE_VERSION, version)
+    return version
+
+
+def incrementer_version_modes(**kwargs):
+    """
+    Invalide la version courante une fois la transaction en cours validée
+    (utilisable comme récepteur de signal)
+    """
+    transaction.on_commit(lambda: cache.set(CLE_VERSION, time.time_ns(), timeout=None))
@@ -0,0 +1,40 @@
+"""
+Requêtes conditionnelles (ETag) pour les endpoints de catalogue
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def catalogue_conditionnel(version):
+    """
+    Décorateur de vue ajoutant un en-tête ETag calculé à partir de
+    `version()`, la version des données du catalogue, incrémentée par signal
+    à chaque écriture. Une requête portant un If-None-Match à jour reçoit
+    une réponse 304 sans requête en base.
+
+    Pas de Last-Modified : à la seconde près, une modification faite dans la
+    même seconde que la réponse précédente ne serait pas détectée.
+    """
+    def decorateur(vue):
+        @wraps(vue)
+        def vue_conditionnelle(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vue(request, *args, **kwargs)
+
+            etag = quote_etag(hashlib.sha256(str(version()).encode()).hexdigest()[:32])
+            reponse = get_conditional_response(request, etag=etag)
+            if reponse is not None:
+                return reponse
+
+            reponse = vue(request, *args, **kwargs)
+            # Seules les réponses valides peuvent être revalidées par le client
+            if reponse.status_code == 200:
+                reponse.headers.setdefault('ETag', etag)
+            return reponse
+
+        return vue_conditionnelle
+
+    return decorateur
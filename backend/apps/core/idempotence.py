@@ -0,0 +1,151 @@
+"""
+Idempotence des requêtes d'écriture (en-tête Idempotency-Key).
+
+L'application mobile renvoie une requête lorsque la connexion coupe avant
+la réponse. Avec une clé Idempotency-Key, la première exécution réussie
+est enregistrée (table ReponseIdempotente, doublée du cache pour les
+relectures rapides) ; les tentatives suivantes reçoivent la même réponse
+sans que la vue ne soit exécutée à nouveau.
+
+Seules les réponses 2xx sont enregistrées : après une erreur, le client
+peut réessayer avec la même clé.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ReponseIdempotente
+from .renderers import encoder_json
+
+EN_TETE = 'Idempotency-Key'
+DUREE_CONSERVATION = timedelta(hours=24)
+# Une réservation abandonnée (processus interrompu) libère la clé après ce délai
+DUREE_RESERVATION = timedelta(minutes=2)
+
+
+def _cle_cache(utilisateur_id, cle):
+    return f"idempotence:{utilisateur_id}:{hashlib.sha256(cle.encode()).hexdigest()}"
+
+
+def _empreinte(request):
+    """Empreinte de la requête, pour refuser une clé réutilisée sur une autre requête"""
+    contenu = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{contenu}".encode()).hexdigest()
+
+
+def _rejouer(enregistrement, empreinte):
+    """Réponse à une tentative répétée, à partir de (empreinte, statut, corps)"""
+    empreinte_enregistree, statut_http, corps = enregistrement
+    if empreinte_enregistree != empreinte:
+        return Response(
+            {'error': f"{EN_TETE} déjà utilisée pour une autre requête"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    return Response(corps, status=statut_http, headers={'Idempotent-Replayed': 'true'})
+
+
+def _reserver(utilisateur, cle, empreinte):
+    """
+    Réserve la clé avant d'exécuter la vue. Retourne (réservation, None),
+    ou (None, réponse) si la clé est déjà utilisée.
+    """
+    maintenant = timezone.now()
+    try:
+        with transaction.atomic():
+            ReponseIdempotente.objects.filter(
+                utilisateur=utilisateur, cle=cle, expire_le__lte=maintenant
+            ).delete()
+            return ReponseIdempotente.objects.create(
+                utilisateur=utilisateur,
+                cle=cle,
+                empreinte=empreinte,
+                expire_le=maintenant + DUREE_RESERVATION
+            ), None
+    except IntegrityError:
+        existante = ReponseIdempotente.objects.filter(utilisateur=utilisateur, cle=cle).first()
+
+    if existante is None or not existante.est_terminee:
+        return None, Response(
+            {'error': "Une requête avec cette clé est en cours de traitement"},
+            status=status.HTTP_409_CONFLICT
+        )
+    return None, _rejouer((existante.empreinte, existante.statut_http, existante.corps), empreinte)
+
+
+def executer_idempotent(request, executer):
+    """
+    Exécute `executer()` une seule fois par utilisateur et par clé
+    Idempotency-Key ; sans clé, la requête est traitée normalement
+    """
+    cle = request.headers.get(EN_TETE)
+    if not cle or not request.user.is_authenticated:
+        return executer()
+    if len(cle) > 255:
+        return Response(
+            {'error': f"{EN_TETE} ne doit pas dépasser 255 caractères"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    empreinte = _empreinte(request)
+    cle_cache = _cle_cache(request.user.pk, cle)
+    enregistrement = cache.get(cle_cache)
+    if enregistrement is None:
+        existante = ReponseIdempotente.objects.filter(
+            utilisateur=request.user, cle=cle, expire_le__gt=timezone.now(), statut_http__isnull=False
+        ).first()
+        if existante is not None:
+            enregistrement = (existante.empreinte, existante.statut_http, existante.corps)
+            cache.set(cle_cache, enregistrement, int((existante.expire_le - timezone.now()).total_seconds()))
+    if enregistrement is not None:
+        return _rejouer(enregistrement, empreinte)
+
+    reservation, reponse = _reserver(request.user, cle, empreinte)
+    if reponse is not None:
+        return reponse
+
+    try:
+        reponse = executer()
+    except Exception:
+        reservation.delete()
+        raise
+
+    if not status.is_success(reponse.status_code):
+        reservation.delete()
+        return reponse
+
+    # Corps normalisé en JSON : la relecture depuis la base ou le cache est identique
+    corps = json.loads(encoder_json(reponse.data))
+    reservation.statut_http = reponse.status_code
+    reservation.corps = corps
+    reservation.expire_le = timezone.now() + DUREE_CONSERVATION
+    reservation.save(update_fields=['statut_http', 'corps', 'expire_le'])
+    cache.set(
+        cle_cache, (empreinte, reponse.status_code, corps),
+        int(DUREE_CONSERVATION.total_seconds())
+    )
+    return reponse
+
+
+def idempotent(vue):
+    """
+    Décorateur de vue d'écriture (sous @api_view) : une requête répétée avec
+    le même en-tête Idempotency-Key reçoit la réponse enregistrée
+    """
+    @wraps(vue)
+    def vue_idempotente(request, *args, **kwargs):
+        return executer_idempotent(request, lambda: vue(request, *args, **kwargs))
+
+    return vue_idempotente
+
+
+def purger_reponses_expirees():
+    """Supprime les réponses expirées ; retourne le nombre de lignes supprimées"""
+    nombre, _ = ReponseIdempotente.objects.filter(expire_le__lte=timezone.now()).delete()
+    return nombre
@@ -0,0 +1,18 @@
+"""
+Supprime les réponses idempotentes expirées (clés Idempotency-Key).
+
+À planifier régulièrement, par exemple une fois par heure :
+
+    python manage.py purger_idempotence
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.idempotence import purger_reponses_expirees
+
+
+class Command(BaseCommand):
+    help = "Supprime les réponses idempotentes expirées"
+
+    def handle(self, *args, **options):
+        nombre = purger_reponses_expirees()
+        self.stdout.write(self.style.SUCCESS(f"{nombre} réponses expirées supprimées"))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReponseIdempotente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=255, verbose_name="Clé d'idempotence")),
+                ('empreinte', models.CharField(help_text='Empreinte de la méthode, du chemin et du contenu de la requête', max_length=64, verbose_name='Empreinte')),
+                ('statut_http', models.PositiveSmallIntegerField(blank=True, help_text='Vide tant que la requête est en cours de traitement', null=True, verbose_name='Statut HTTP')),
+                ('corps', models.JSONField(blank=True, null=True, verbose_name='Corps de la réponse')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('expire_le', models.DateTimeField(db_index=True, verbose_name="Date d'expiration")),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reponses_idempotentes', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Réponse idempotente',
+                'verbose_name_plural': 'Réponses idempotentes',
+                'ordering': ['-created_at'],
+                'unique_together': {('utilisateur', 'cle')},
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 """
 Modèles de base et utilitaires communs pour BasicFit
 """
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
@@ -124,4 +125,60 @@ class ModeEntrainement(TimeStampedModel):
             return 20
         elif self.nom == 'POWERLIFTING':
             return 3
-        return 10
\ No newline at end of file
+        return 10
+
+
+class ReponseIdempotente(models.Model):
+    """
+    Réponse d'une requête d'écriture, enregistrée sous la clé
+    Idempotency-Key envoyée par le client. Une nouvelle tentative avec la
+    même clé reçoit la réponse enregistrée au lieu de refaire l'écriture.
+    """
+    utilisateur = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='reponses_idempotentes',
+        verbose_name="Utilisateur"
+    )
+    cle = models.CharField(
+        max_length=255,
+        verbose_name="Clé d'idempotence"
+    )
+    empreinte = models.CharField(
+        max_length=64,
+        help_text="Empreinte de la méthode, du chemin et du contenu de la requête",
+        verbose_name="Empreinte"
+    )
+    statut_http = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Vide tant que la requête est en cours de traitement",
+        verbose_name="Statut HTTP"
+    )
+    corps = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Corps de la réponse"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    expire_le = models.DateTimeField(
+        db_index=True,
+        verbose_name="Date d'expiration"
+    )
+
+    class Meta:
+        verbose_name = "Réponse idempotente"
+        verbose_name_plural = "Réponses idempotentes"
+        unique_together = ['utilisateur', 'cle']
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.utilisateur_id} - {self.cle}"
+
+    @property
+    def est_terminee(self):
+        """Vérifie si la réponse a été enregistrée"""
+        return self.statut_http is not None
@@ -0,0 +1,67 @@
+"""
+Rendu JSON de l'API : encodeur rapide (orjson) lorsqu'il est installé et
+réponses en flux pour les grandes listes
+"""
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - repli sur l'encodeur de DRF
+    orjson = None
+
+
+_encodeur_drf = JSONEncoder()
+
+
+def encoder_json(data):
+    """
+    Encode des données en JSON compact UTF-8, comme le JSONRenderer de DRF.
+    Les types que orjson ne connaît pas (Decimal, chaînes paresseuses...)
+    et les dates passent par l'encodeur de DRF.
+    """
+    if orjson is None:
+        return JSONRenderer().render(data)
+
+    # Dates confiées à DRF : même format (suffixe Z en UTC, microsecondes)
+    contenu = orjson.dumps(
+        data,
+        default=_encodeur_drf.default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    # Mêmes échappements que DRF pour rester compatible avec JavaScript
+    return contenu.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class RenduJSONRapide(JSONRenderer):
+    """
+    JSONRenderer utilisant orjson lorsqu'il est disponible. Les réponses
+    indentées (?indent= dans l'en-tête Accept) gardent le rendu de DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return encoder_json(data)
+
+
+def reponse_json_en_flux(elements, status=200):
+    """
+    Réponse JSON contenant un tableau, encodée lot par lot.
+    `elements` est un itérable de listes (lots) d'objets sérialisables :
+    chaque lot est envoyé dès qu'il est encodé, seul le lot en cours est
+    gardé en mémoire.
+    """
+    def contenu():
+        separateur = b''
+        yield b'['
+        for lot in elements:
+            if lot:
+                yield separateur + b','.join(encoder_json(element) for element in lot)
+                separateur = b','
+        yield b']'
+
+    return StreamingHttpResponse(contenu(), status=status, content_type='application/json')
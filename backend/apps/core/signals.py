@@ -0,0 +1,15 @@
+"""
+Signaux de l'application core
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ModeEntrainement
+from .catalogue import incrementer_version_modes
+
+
+@receiver(post_save, sender=ModeEntrainement)
+@receiver(post_delete, sender=ModeEntrainement)
+def mode_modifie(sender, **kwargs):
+    """Change l'ETag de la liste des modes"""
+    incrementer_version_modes()
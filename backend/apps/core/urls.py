@@ -7,6 +7,7 @@ from . import views
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health-check'),
+    path('cache/', views.cache_stats, name='cache-stats'),
 
     # App info
     path('info/', views.api_info, name='api-info'),
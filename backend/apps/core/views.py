@@ -3,13 +3,17 @@ Vues simplifiées pour l'API core (modes d'entraînement, health check, etc.)
 """
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from django.db import connection
 
 from .models import ModeEntrainement
+from .cache_utilisateur import statistiques_cache
+from .conditional import catalogue_conditionnel
+from .catalogue import version_modes
 
 
+@catalogue_conditionnel(version_modes)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def modes_entrainement_list(request):
@@ -56,6 +60,13 @@ def health_check(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Compteurs de succès et d'échecs du cache des réponses par utilisateur"""
+    return Response(statistiques_cache())
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_info(request):
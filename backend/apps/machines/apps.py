@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class MachinesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.machines'
-    verbose_name = 'Machines'
\ No newline at end of file
+    verbose_name = 'Machines'
+
+    def ready(self):
+        from . import signals  # noqa: F401
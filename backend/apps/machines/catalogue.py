@@ -0,0 +1,38 @@
+"""
+Version du catalogue de machines.
+
+La version change à chaque modification d'une machine, d'un groupe
+musculaire ou d'une catégorie (voir signals.py) ; elle sert de clé aux
+réponses du catalogue mises en cache et d'ETag (core.conditional).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CLE_VERSION = 'machines:catalogue:version'
+DUREE_CACHE = 60 * 60
+
+
+def version_catalogue():
+    """Retourne la version courante du catalogue"""
+    version = cache.get(CLE_VERSION)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CLE_VERSION, version, timeout=None):
+            version = cache.get(CLE_VERSION, version)
+    return version
+
+
+def incrementer_version_catalogue(**kwargs):
+    """
+    Invalide les réponses en cache une fois la transaction en cours validée
+    (utilisable comme récepteur de signal) : une lecture concurrente ne peut
+    pas mettre en cache l'ancien catalogue sous la nouvelle version
+    """
+    transaction.on_commit(lambda: cache.set(CLE_VERSION, time.time_ns(), timeout=None))
+
+
+def cle_cache(nom):
+    """Clé de cache d'une réponse du catalogue pour la version courante"""
+    return f'machines:catalogue:{version_catalogue()}:{nom}'
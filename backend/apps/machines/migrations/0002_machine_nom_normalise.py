@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:27
+
+from django.db import migrations, models
+
+from apps.machines.models import normaliser_nom_machine
+
+
+def normaliser_noms(apps, schema_editor):
+    """Renseigne le nom normalisé des machines existantes"""
+    Machine = apps.get_model('machines', 'Machine')
+    machines = list(Machine.objects.only('id', 'nom'))
+    for machine in machines:
+        machine.nom_normalise = normaliser_nom_machine(machine.nom)
+    Machine.objects.bulk_update(machines, ['nom_normalise'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('machines', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machine',
+            name='nom_normalise',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Nom en minuscules et sans accents, utilisé pour la recherche', max_length=100, verbose_name='Nom normalisé'),
+        ),
+        migrations.RunPython(normaliser_noms, migrations.RunPython.noop),
+    ]
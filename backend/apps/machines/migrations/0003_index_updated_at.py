@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('machines', '0002_machine_nom_normalise'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='categoriemachine',
+            index=models.Index(fields=['updated_at'], name='machines_ca_updated_9de683_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='groupemusculaire',
+            index=models.Index(fields=['updated_at'], name='machines_gr_updated_2c8b86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='machine',
+            index=models.Index(fields=['updated_at'], name='machines_ma_updated_b36845_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='variantemachine',
+            index=models.Index(fields=['updated_at'], name='machines_va_updated_abfad2_idx'),
+        ),
+    ]
@@ -1,12 +1,24 @@
 """
 Modèles pour les machines et équipements de BasicFit
 """
+import unicodedata
+
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 from apps.core.models import TimeStampedModel, SoftDeletableModel
 
 
+def normaliser_nom_machine(nom):
+    """
+    Normalise un nom de machine pour la recherche : minuscules, sans accents
+    et avec les espaces superflus supprimés
+    """
+    decompose = unicodedata.normalize('NFKD', nom or '')
+    sans_accents = ''.join(c for c in decompose if not unicodedata.combining(c))
+    return ' '.join(sans_accents.lower().split())
+
+
 class GroupeMusculaire(TimeStampedModel):
     """
     Modèle pour les groupes musculaires
@@ -42,6 +54,9 @@ class GroupeMusculaire(TimeStampedModel):
         verbose_name = "Groupe musculaire"
         verbose_name_plural = "Groupes musculaires"
         ordering = ['ordre_affichage', 'nom']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return self.nom
@@ -86,6 +101,9 @@ class CategorieMachine(TimeStampedModel):
         verbose_name = "Catégorie de machine"
         verbose_name_plural = "Catégories de machines"
         ordering = ['nom']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return self.get_nom_display()
@@ -106,6 +124,14 @@ class Machine(SoftDeletableModel):
         max_length=100,
         verbose_name="Nom de la machine"
     )
+    nom_normalise = models.CharField(
+        max_length=100,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Nom en minuscules et sans accents, utilisé pour la recherche",
+        verbose_name="Nom normalisé"
+    )
     nom_anglais = models.CharField(
         max_length=100,
         blank=True,
@@ -238,6 +264,7 @@ class Machine(SoftDeletableModel):
         indexes = [
             models.Index(fields=['categorie', 'est_disponible']),
             models.Index(fields=['popularite']),
+            models.Index(fields=['updated_at']),
         ]
 
     def __str__(self):
@@ -253,6 +280,14 @@ class Machine(SoftDeletableModel):
         if self.increment_poids > (self.poids_maximum - self.poids_minimum):
             raise ValidationError("L'incrément ne peut pas être supérieur à la plage de poids")
 
+    def save(self, *args, **kwargs):
+        """Override save pour maintenir le nom normalisé"""
+        self.nom_normalise = normaliser_nom_machine(self.nom)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nom' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nom_normalise'}
+        super().save(*args, **kwargs)
+
     @property
     def groupes_musculaires_tous(self):
         """Retourne tous les groupes musculaires (primaires + secondaires)"""
@@ -311,6 +346,9 @@ class VarianteMachine(TimeStampedModel):
         verbose_name = "Variante de machine"
         verbose_name_plural = "Variantes de machines"
         unique_together = ['machine', 'nom']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
 
     def __str__(self):
         return f"{self.machine.nom} - {self.nom}"
\ No newline at end of file
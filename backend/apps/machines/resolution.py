@@ -0,0 +1,99 @@
+"""
+Résolution des noms de machines envoyés par les clients.
+
+Un index en mémoire associe chaque nom normalisé à l'identifiant de la
+machine active correspondante ; une machine désactivée n'est plus
+proposée. Il est construit au premier usage et invalidé à chaque
+enregistrement ou suppression d'une machine (voir signals.py).
+"""
+import threading
+
+from django.db import transaction
+
+from .models import Machine, CategorieMachine, normaliser_nom_machine
+
+CATEGORIE_PAR_DEFAUT = 'MUSCULATION'
+
+_verrou = threading.Lock()
+_index = None
+
+
+def _construire_index():
+    """
+    Charge l'index {nom normalisé: id} des machines actives, la plus
+    ancienne l'emportant
+    """
+    index = {}
+    for cle, machine_id in Machine.objects.filter(is_active=True).order_by('-id').values_list(
+        'nom_normalise', 'id'
+    ):
+        index[cle] = machine_id
+    return index
+
+
+def index_machines():
+    """Retourne l'index des machines, en le construisant si nécessaire"""
+    global _index
+    index = _index
+    if index is None:
+        with _verrou:
+            if _index is None:
+                _index = _construire_index()
+            index = _index
+    return index
+
+
+def invalider_index_machines(**kwargs):
+    """Vide l'index (utilisable directement comme récepteur de signal)"""
+    global _index
+    with _verrou:
+        _index = None
+
+
+def resoudre_machines(noms):
+    """
+    Associe chaque nom à l'identifiant d'une machine.
+    Les noms inconnus donnent lieu à la création d'une machine basique.
+    """
+    cles = {nom: normaliser_nom_machine(nom) for nom in noms}
+    index = index_machines()
+
+    resultat = {nom: index.get(cle) for nom, cle in cles.items()}
+    manquants = {}
+    for nom, machine_id in resultat.items():
+        if machine_id is None:
+            manquants.setdefault(cles[nom], nom)
+
+    if manquants:
+        trouvees = _trouver_ou_creer_machines(manquants)
+        with _verrou:
+            index.update(trouvees)
+        for nom, cle in cles.items():
+            if resultat[nom] is None:
+                resultat[nom] = trouvees[cle]
+
+    return resultat
+
+
+@transaction.atomic
+def _trouver_ou_creer_machines(manquants):
+    """
+    Recherche en base les machines absentes de l'index et crée celles qui
+    n'existent pas encore. Le verrou sur la catégorie par défaut sérialise
+    les créations concurrentes entre processus : une machine créée par une
+    autre requête entre-temps est réutilisée au lieu d'être dupliquée.
+    """
+    categorie, _ = CategorieMachine.objects.get_or_create(nom=CATEGORIE_PAR_DEFAUT)
+    CategorieMachine.objects.select_for_update().get(pk=categorie.pk)
+
+    trouvees = {}
+    for cle, machine_id in Machine.objects.filter(
+        nom_normalise__in=manquants, is_active=True
+    ).order_by('-id').values_list('nom_normalise', 'id'):
+        trouvees[cle] = machine_id
+
+    for cle, nom in manquants.items():
+        if cle not in trouvees:
+            trouvees[cle] = Machine.objects.create(nom=nom, categorie=categorie).id
+
+    return trouvees
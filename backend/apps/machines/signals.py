@@ -0,0 +1,76 @@
+"""
+Signaux de l'application machines
+"""
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import GroupeMusculaire, CategorieMachine, Machine
+from .catalogue import incrementer_version_catalogue
+from .resolution import invalider_index_machines
+
+
+@receiver(post_save, sender=Machine)
+@receiver(post_delete, sender=Machine)
+def machine_modifiee(sender, **kwargs):
+    """Invalide l'index des noms de machines et le catalogue en cache"""
+    invalider_index_machines()
+    incrementer_version_catalogue()
+
+
+@receiver(post_save, sender=GroupeMusculaire)
+@receiver(post_delete, sender=GroupeMusculaire)
+@receiver(post_save, sender=CategorieMachine)
+@receiver(post_delete, sender=CategorieMachine)
+def catalogue_modifie(sender, **kwargs):
+    """Invalide le catalogue en cache"""
+    incrementer_version_catalogue()
+
+
+@receiver(post_save, sender=GroupeMusculaire)
+@receiver(pre_delete, sender=GroupeMusculaire)
+@receiver(post_save, sender=CategorieMachine)
+def machines_a_resynchroniser(sender, instance, created=False, **kwargs):
+    """
+    Les machines embarquent le nom, la couleur et l'icône de leur catégorie
+    et de leurs groupes : leur date de modification suit celle de ces
+    objets, pour que la synchronisation (machines_changes) les renvoie
+    """
+    if created:
+        return
+    if sender is CategorieMachine:
+        machines = Machine.objects.filter(categorie=instance)
+    else:
+        machines = Machine.objects.filter(pk__in=Machine.objects.filter(
+            Q(groupes_musculaires_primaires=instance) | Q(groupes_musculaires_secondaires=instance)
+        ).values('pk'))
+    machines.update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Machine.groupes_musculaires_primaires.through)
+@receiver(m2m_changed, sender=Machine.groupes_musculaires_secondaires.through)
+def groupes_machine_modifies(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Répercute un changement de groupes musculaires sur la date de
+    modification des machines concernées, puis invalide le catalogue
+    """
+    if action == 'post_clear':
+        incrementer_version_catalogue()
+        return
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        machines = Machine.objects.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        # Les liens existent encore avant leur suppression
+        machines = Machine.objects.filter(pk__in=sender.objects.filter(
+            groupemusculaire_id=instance.pk
+        ).values('machine_id'))
+    else:
+        machines = Machine.objects.filter(pk__in=pk_set)
+
+    machines.update(updated_at=timezone.now())
+    if action != 'pre_clear':
+        incrementer_version_catalogue()
@@ -7,6 +7,7 @@ from . import views
 urlpatterns = [
     path('', views.machines_list, name='machines-list'),
     path('<int:pk>/', views.machine_detail, name='machine-detail'),
+    path('changes/', views.machines_changes, name='machines-changes'),
     path('groupes-musculaires/', views.groupes_musculaires_list, name='groupes-musculaires'),
     path('categories/', views.categories_machines_list, name='categories'),
 ]
\ No newline at end of file
@@ -1,14 +1,45 @@
 """
 Vues simplifiées pour l'API des machines
 """
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from apps.core.conditional import catalogue_conditionnel
 from .models import GroupeMusculaire, CategorieMachine, Machine, VarianteMachine
+from .catalogue import cle_cache, version_catalogue, DUREE_CACHE
+
+
+def _groupe_complet_data(groupe):
+    """Représentation complète d'un groupe musculaire"""
+    return {
+        'id': groupe.id,
+        'nom': groupe.nom,
+        'description': groupe.description,
+        'couleur': groupe.couleur,
+        'icone': groupe.icone
+    }
 
 
+def _categorie_data(cat):
+    """Représentation d'une catégorie de machines"""
+    return {
+        'id': cat.id,
+        'nom': cat.get_nom_display(),
+        'nom_code': cat.nom,
+        'description': cat.description,
+        'couleur': cat.couleur,
+        'icone': cat.icone
+    }
+
+
+@catalogue_conditionnel(version_catalogue)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def groupes_musculaires_list(request):
@@ -17,18 +48,13 @@ def groupes_musculaires_list(request):
         groupes = GroupeMusculaire.objects.filter(is_active=True).order_by('nom')
         data = []
         for groupe in groupes:
-            data.append({
-                'id': groupe.id,
-                'nom': groupe.nom,
-                'description': groupe.description,
-                'couleur': groupe.couleur,
-                'icone': groupe.icone
-            })
+            data.append(_groupe_complet_data(groupe))
         return Response(data)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+@catalogue_conditionnel(version_catalogue)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def categories_machines_list(request):
@@ -37,60 +63,180 @@ def categories_machines_list(request):
         categories = CategorieMachine.objects.filter(is_active=True).order_by('nom')
         data = []
         for cat in categories:
-            data.append({
-                'id': cat.id,
-                'nom': cat.get_nom_display(),
-                'nom_code': cat.nom,
-                'description': cat.description,
-                'couleur': cat.couleur,
-                'icone': cat.icone
-            })
+            data.append(_categorie_data(cat))
         return Response(data)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+def _groupe_data(groupe):
+    """Représentation abrégée d'un groupe musculaire"""
+    return {
+        'nom': groupe.nom,
+        'couleur': groupe.couleur,
+        'icone': groupe.icone
+    }
+
+
+def _machine_data(machine):
+    """Représentation d'une machine dans le catalogue"""
+    return {
+        'id': machine.id,
+        'nom': machine.nom,
+        'nom_anglais': machine.nom_anglais or machine.nom,
+        'categorie': machine.categorie.get_nom_display() if machine.categorie else None,
+        'categorie_code': machine.categorie.nom if machine.categorie else None,
+        'description': machine.description,
+        'instructions': machine.instructions,
+        'niveau_difficulte': machine.get_niveau_difficulte_display(),
+        'niveau_code': machine.niveau_difficulte,
+        'poids_minimum': float(machine.poids_minimum),
+        'poids_maximum': float(machine.poids_maximum),
+        'increment_poids': float(machine.increment_poids),
+        'popularite': machine.popularite,
+        'necessite_supervision': machine.necessite_supervision,
+        'groupes_musculaires_primaires': [
+            _groupe_data(groupe) for groupe in machine.groupes_musculaires_primaires.all()
+        ],
+        'fabricant': machine.fabricant or '',
+        'modele': machine.modele or ''
+    }
+
+
+def _construire_liste_machines():
+    """Construit le catalogue des machines disponibles en un nombre constant de requêtes"""
+    machines = (
+        Machine.objects.filter(est_disponible=True, is_active=True)
+        .select_related('categorie')
+        .prefetch_related('groupes_musculaires_primaires')
+        .order_by('nom')
+    )
+    return [_machine_data(machine) for machine in machines]
+
+
+@catalogue_conditionnel(version_catalogue)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def machines_list(request):
     """Liste des machines disponibles"""
     try:
-        machines = Machine.objects.filter(est_disponible=True, is_active=True).order_by('nom')
-        data = []
-        for machine in machines:
-            # Récupérer les groupes musculaires primaires
-            groupes_primaires = []
-            for groupe in machine.groupes_musculaires_primaires.all():
-                groupes_primaires.append({
-                    'nom': groupe.nom,
-                    'couleur': groupe.couleur,
-                    'icone': groupe.icone
-                })
-
-            data.append({
-                'id': machine.id,
-                'nom': machine.nom,
-                'nom_anglais': machine.nom_anglais or machine.nom,
-                'categorie': machine.categorie.get_nom_display() if machine.categorie else None,
-                'categorie_code': machine.categorie.nom if machine.categorie else None,
-                'description': machine.description,
-                'instructions': machine.instructions,
-                'niveau_difficulte': machine.get_niveau_difficulte_display(),
-                'niveau_code': machine.niveau_difficulte,
-                'poids_minimum': float(machine.poids_minimum),
-                'poids_maximum': float(machine.poids_maximum),
-                'increment_poids': float(machine.increment_poids),
-                'popularite': machine.popularite,
-                'necessite_supervision': machine.necessite_supervision,
-                'groupes_musculaires_primaires': groupes_primaires,
-                'fabricant': machine.fabricant or '',
-                'modele': machine.modele or ''
-            })
+        cle = cle_cache('machines_list')
+        data = cache.get(cle)
+        if data is None:
+            data = _construire_liste_machines()
+            cache.set(cle, data, DUREE_CACHE)
         return Response({'results': data, 'count': len(data)})
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+# Recouvrement entre deux synchronisations (transactions validées en retard)
+MARGE_SYNCHRONISATION = timedelta(minutes=5)
+
+
+def _encoder_curseur(date):
+    """Curseur opaque de synchronisation"""
+    return urlsafe_base64_encode(date.isoformat().encode()) if date else None
+
+
+def _decoder_curseur(curseur):
+    """Date encodée dans un curseur de synchronisation"""
+    try:
+        date = datetime.fromisoformat(urlsafe_base64_decode(curseur).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Curseur invalide")
+    if timezone.is_naive(date):
+        raise ValueError("Curseur invalide")
+    return date
+
+
+def _changements(queryset, depuis, est_visible, representation):
+    """
+    Lignes modifiées depuis le curseur, séparées entre lignes à jour et
+    lignes supprimées (ou masquées) côté client.
+
+    Les lignes des MARGE_SYNCHRONISATION précédant le curseur sont relues :
+    une transaction validée après la synchronisation précédente peut porter
+    une date antérieure au curseur. Le client les remplace par identifiant.
+    """
+    if depuis is not None:
+        queryset = queryset.filter(updated_at__gt=depuis - MARGE_SYNCHRONISATION)
+
+    modifies = []
+    supprimes = []
+    derniere = None
+    for objet in queryset.order_by('updated_at', 'id'):
+        if est_visible(objet):
+            modifies.append(representation(objet))
+        else:
+            supprimes.append(objet.id)
+        derniere = objet.updated_at
+
+    return {'modifies': modifies, 'supprimes': supprimes}, derniere
+
+
+def _variante_data(variante):
+    """Représentation d'une variante de machine"""
+    return {
+        'id': variante.id,
+        'machine_id': variante.machine_id,
+        'nom': variante.nom,
+        'description': variante.description,
+        'niveau_difficulte': variante.get_niveau_difficulte_display()
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def machines_changes(request):
+    """
+    Modifications du catalogue depuis un curseur de synchronisation.
+    Sans curseur, le catalogue complet est renvoyé. Une ligne peut être
+    renvoyée par deux synchronisations successives (voir _changements).
+    """
+    try:
+        curseur = request.query_params.get('since')
+        depuis = _decoder_curseur(curseur) if curseur else None
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        machines, derniere_machine = _changements(
+            Machine.objects.select_related('categorie').prefetch_related('groupes_musculaires_primaires'),
+            depuis,
+            lambda machine: machine.is_active and machine.est_disponible,
+            _machine_data
+        )
+        variantes, derniere_variante = _changements(
+            VarianteMachine.objects.all(), depuis,
+            lambda variante: variante.is_active, _variante_data
+        )
+        groupes, dernier_groupe = _changements(
+            GroupeMusculaire.objects.all(), depuis,
+            lambda groupe: groupe.is_active, _groupe_complet_data
+        )
+        categories, derniere_categorie = _changements(
+            CategorieMachine.objects.all(), depuis,
+            lambda cat: cat.is_active, _categorie_data
+        )
+
+        dates = [
+            date for date in (
+                depuis, derniere_machine, derniere_variante, dernier_groupe, derniere_categorie
+            ) if date
+        ]
+        return Response({
+            'cursor': _encoder_curseur(max(dates)) if dates else curseur,
+            'complet': depuis is None,
+            'machines': machines,
+            'variantes': variantes,
+            'groupes_musculaires': groupes,
+            'categories': categories
+        })
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def machine_detail(request, pk):
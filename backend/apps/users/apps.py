@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
-    verbose_name = 'Utilisateurs'
\ No newline at end of file
+    verbose_name = 'Utilisateurs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
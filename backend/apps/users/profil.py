@@ -0,0 +1,38 @@
+"""
+Profil utilisateur envoyé à l'application Android.
+
+La représentation est mise en cache par utilisateur et invalidée à chaque
+enregistrement de l'utilisateur (voir signals.py).
+"""
+from django.core.cache import cache
+
+DUREE_CACHE = 60 * 60
+
+
+def cle_profil(utilisateur_id):
+    return f'users:profil_android:{utilisateur_id}'
+
+
+def profil_android(user):
+    """Champs du profil affichés par l'application Android"""
+    cle = cle_profil(user.pk)
+    profil = cache.get(cle)
+    if profil is None:
+        profil = {
+            'id': user.id,
+            'email': user.email,
+            'nom': user.nom,
+            'prenom': user.prenom,
+            'poids': user.poids,
+            'taille': user.taille,
+            'objectif_sportif': user.objectif_sportif,
+            'niveau_experience': user.niveau_experience,
+            'date_naissance': user.date_naissance.isoformat() if user.date_naissance else None,
+        }
+        cache.set(cle, profil, DUREE_CACHE)
+    return profil
+
+
+def invalider_profil_android(sender, instance, **kwargs):
+    """Supprime le profil en cache (utilisable comme récepteur de signal)"""
+    cache.delete(cle_profil(instance.pk))
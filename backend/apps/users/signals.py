@@ -0,0 +1,17 @@
+"""
+Signaux de l'application users
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.cache_utilisateur import incrementer_version_utilisateur
+from .models import User
+from .profil import invalider_profil_android
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def utilisateur_modifie(sender, instance, **kwargs):
+    """Invalide le profil Android et les réponses en cache de l'utilisateur"""
+    invalider_profil_android(sender, instance)
+    incrementer_version_utilisateur(instance.pk)
@@ -16,6 +16,8 @@ from django.utils.decorators import method_decorator
 from django.utils import timezone
 
 from .models import User, ProfilUtilisateur
+from .profil import profil_android
+from apps.core.cache_utilisateur import en_cache_utilisateur
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, CustomTokenObtainPairSerializer,
     UserProfileSerializer, ProfilUtilisateurSerializer, PasswordChangeSerializer
@@ -182,39 +184,29 @@ class UserStatsView(APIView):
     def get(self, request):
         """Récupérer les statistiques de l'utilisateur"""
         user = request.user
+        statistiques = en_cache_utilisateur(
+            user.pk, f'users:statistiques:{timezone.localdate():%G-%V}',
+            lambda: statistiques_utilisateur(user)
+        )
+        return Response(statistiques, status=status.HTTP_200_OK)
 
-        # Import conditionnel pour éviter les dépendances circulaires
-        from apps.workouts.models import SeanceEntrainement
-        from django.utils import timezone
-        from datetime import timedelta
-
-        # Calculer les statistiques
-        now = timezone.now()
-        seances_cette_semaine = SeanceEntrainement.objects.filter(
-            utilisateur=user,
-            date_debut__gte=now - timedelta(days=7),
-            statut='TERMINEE'
-        ).count()
-
-        total_seances = SeanceEntrainement.objects.filter(
-            utilisateur=user,
-            statut='TERMINEE'
-        ).count()
-
-        derniere_seance = SeanceEntrainement.objects.filter(
-            utilisateur=user,
-            statut='TERMINEE'
-        ).order_by('-date_debut').first()
 
-        return Response({
-            'seances_cette_semaine': seances_cette_semaine,
-            'total_seances': total_seances,
-            'derniere_seance': derniere_seance.date_debut if derniere_seance else None,
-            'membre_depuis': user.date_joined.strftime('%d/%m/%Y'),
-            'est_premium': user.est_premium,
-            'objectif_sportif': user.objectif_sportif,
-            'niveau_experience': user.niveau_experience
-        }, status=status.HTTP_200_OK)
+def statistiques_utilisateur(user):
+    """Activité et informations de compte de l'utilisateur, en une seule requête"""
+    # Import conditionnel pour éviter les dépendances circulaires
+    from apps.workouts.models import SeanceEntrainement
+
+    activite = SeanceEntrainement.objects.filter(utilisateur=user).resume_activite()
+
+    return {
+        'seances_cette_semaine': activite['seances_cette_semaine'],
+        'total_seances': activite['total_seances'],
+        'derniere_seance': activite['derniere_seance'],
+        'membre_depuis': user.date_joined.strftime('%d/%m/%Y'),
+        'est_premium': user.est_premium,
+        'objectif_sportif': user.objectif_sportif,
+        'niveau_experience': user.niveau_experience
+    }
 
 
 # ============= VUES WEB POUR L'INTERFACE HTML =============
@@ -279,29 +271,28 @@ def login_view(request):
 @login_required
 def dashboard_view(request):
     """Vue du tableau de bord utilisateur"""
-    from apps.workouts.models import SeanceEntrainement
-    from django.utils import timezone
-    from datetime import timedelta
+    from apps.workouts.models import SeanceEntrainement, StatistiquesUtilisateur, AgregatPeriode
 
     user = request.user
-    now = timezone.now()
-
-    # Statistiques
-    seances_cette_semaine = SeanceEntrainement.objects.filter(
-        utilisateur=user,
-        date_debut__gte=now - timedelta(days=7),
-        statut='TERMINEE'
-    ).count()
 
-    derniere_seance = SeanceEntrainement.objects.filter(
-        utilisateur=user,
-        statut='TERMINEE'
-    ).order_by('-date_debut').first()
+    def calculer_statistiques():
+        return {
+            'seances_cette_semaine': AgregatPeriode.seances_periode_courante(user),
+            'derniere_seance': SeanceEntrainement.objects.filter(
+                utilisateur=user,
+                statut='TERMINEE'
+            ).select_related('mode_entrainement').order_by('-date_debut').first(),
+            'seances_excellentes': StatistiquesUtilisateur.pour_utilisateur(user).seances_excellentes
+        }
+
+    # Statistiques (en cache jusqu'à la prochaine modification des séances)
+    statistiques = en_cache_utilisateur(
+        user.pk, f'users:dashboard:{timezone.localdate():%G-%V}', calculer_statistiques
+    )
 
     context = {
         'user': user,
-        'seances_cette_semaine': seances_cette_semaine,
-        'derniere_seance': derniere_seance
+        **statistiques
     }
 
     return render(request, 'users/dashboard.html', context)
@@ -478,20 +469,9 @@ def android_profile(request):
     API simplifiée pour récupérer le profil utilisateur depuis Android
     """
     try:
-        user = request.user
         return Response({
             'success': True,
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'nom': user.nom,
-                'prenom': user.prenom,
-                'poids': user.poids,
-                'taille': user.taille,
-                'objectif_sportif': user.objectif_sportif,
-                'niveau_experience': user.niveau_experience,
-                'date_naissance': user.date_naissance.isoformat() if user.date_naissance else None,
-            }
+            'user': profil_android(request.user)
         })
     except Exception as e:
         return Response({
@@ -500,6 +480,40 @@ def android_profile(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def android_dashboard(request):
+    """
+    Données de l'écran d'accueil Android en un seul appel : profil,
+    activité et statistiques d'entraînement (remplace android/profile/,
+    profile/stats/ et workouts/seances/stats/)
+    """
+    try:
+        from apps.workouts.models import StatistiquesUtilisateur
+        from apps.workouts.serializers import WorkoutStatsSerializer
+
+        user = request.user
+        tableau_de_bord = en_cache_utilisateur(
+            user.pk, f'users:tableau_de_bord:{timezone.localdate():%G-%V}',
+            lambda: {
+                'stats': statistiques_utilisateur(user),
+                'workout_stats': dict(WorkoutStatsSerializer(
+                    StatistiquesUtilisateur.pour_utilisateur(user)
+                ).data)
+            }
+        )
+        return Response({
+            'success': True,
+            'user': profil_android(user),
+            **tableau_de_bord
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'Erreur lors de la récupération du tableau de bord: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET', 'HEAD'])
 @permission_classes([permissions.AllowAny])
 def android_ping(request):
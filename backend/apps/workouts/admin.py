@@ -3,7 +3,8 @@ Configuration de l'admin Django pour les entraînements BasicFit
 """
 from django.contrib import admin
 from .models import (
-    SeanceEntrainement, ExerciceSeance, SeriExercice, ProgressionMachine
+    SeanceEntrainement, ExerciceSeance, SeriExercice, ProgressionMachine,
+    StatistiquesUtilisateur, AgregatPeriode, AgregatMachine, AgregatGroupeMusculaire
 )
 
 
@@ -31,7 +32,8 @@ class ExerciceSeanceInline(admin.TabularInline):
 class SeanceEntrainementAdmin(admin.ModelAdmin):
     list_display = [
         'utilisateur', 'nom', 'mode_entrainement', 'date_prevue',
-        'statut', 'duree_prevue', 'note_ressenti', 'nombre_exercices'
+        'statut', 'duree_prevue', 'note_ressenti', 'nombre_exercices',
+        'est_excellente'
     ]
     list_filter = [
         'statut', 'mode_entrainement', 'date_prevue', 'note_ressenti',
@@ -54,7 +56,7 @@ class SeanceEntrainementAdmin(admin.ModelAdmin):
             'fields': ('date_prevue', 'duree_prevue', 'statut')
         }),
         ('Réalisation', {
-            'fields': ('date_debut', 'date_fin', 'commentaire'),
+            'fields': ('date_debut', 'date_fin', 'duree_reelle', 'commentaire'),
             'classes': ('collapse',)
         }),
         ('Évaluation', {
@@ -82,12 +84,28 @@ class SeanceEntrainementAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = [
-        'volume_total', 'tonnage_total', 'nombre_exercices', 'nombre_series_totales'
+        'duree_reelle', 'volume_total', 'tonnage_total', 'nombre_exercices',
+        'nombre_series_totales'
     ]
+    actions = ['recalculer_metriques']
+
+    @admin.action(description="Recalculer les données calculées depuis les exercices et séries")
+    def recalculer_metriques(self, request, queryset):
+        seances = SeanceEntrainement.objects.filter(pk__in=queryset.values('pk'))
+        ExerciceSeance.objects.filter(seance__in=seances).recalculer_metriques_series()
+        nombre = seances.recalculer_metriques()
+        self.message_user(request, f"{nombre} séance(s) recalculée(s).")
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'utilisateur', 'mode_entrainement'
+        ).avec_taux_excellence()
+
+    @admin.display(boolean=True, description='Excellente', ordering='taux_excellence')
+    def est_excellente(self, obj):
+        return (
+            obj.taux_excellence is not None
+            and obj.taux_excellence >= SeanceEntrainement.RATIO_SEANCE_EXCELLENTE
         )
 
 
@@ -127,7 +145,9 @@ class ExerciceSeanceAdmin(admin.ModelAdmin):
         }),
         ('Métriques', {
             'fields': (
-                'volume_total', 'tonnage_total', 'charge_maximale_theorique'
+                'volume_total', 'tonnage_total', 'charge_maximale_theorique',
+                'meilleure_serie_poids', 'meilleure_serie_repetitions',
+                'meilleur_1rm_serie', 'effort_moyen'
             ),
             'classes': ('collapse',)
         }),
@@ -137,7 +157,7 @@ class ExerciceSeanceAdmin(admin.ModelAdmin):
         }),
     )
 
-    readonly_fields = ['volume_total', 'tonnage_total', 'charge_maximale_theorique']
+    readonly_fields = ExerciceSeance.CHAMPS_METRIQUES
 
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
@@ -240,4 +260,66 @@ class ProgressionMachineAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'utilisateur', 'machine', 'mode_entrainement', 'derniere_seance'
-        )
\ No newline at end of file
+        )
+
+
+@admin.register(StatistiquesUtilisateur)
+class StatistiquesUtilisateurAdmin(admin.ModelAdmin):
+    list_display = [
+        'utilisateur', 'total_seances', 'total_minutes', 'seances_excellentes',
+        'record_poids', 'progression_generale', 'updated_at'
+    ]
+    search_fields = [
+        'utilisateur__email', 'utilisateur__prenom', 'utilisateur__nom'
+    ]
+    ordering = ['-total_seances']
+    readonly_fields = [
+        'total_seances', 'total_minutes', 'seances_excellentes', 'record_poids',
+        'compteur_machines', 'exercices_favoris', 'progression_generale'
+    ]
+    actions = ['recalculer_statistiques']
+
+    @admin.action(description="Recalculer depuis l'historique")
+    def recalculer_statistiques(self, request, queryset):
+        for stats in queryset:
+            stats.recalculer()
+        self.message_user(request, f"{queryset.count()} statistique(s) recalculée(s).")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('utilisateur')
+
+
+@admin.register(AgregatPeriode)
+class AgregatPeriodeAdmin(admin.ModelAdmin):
+    list_display = [
+        'utilisateur', 'periode', 'debut_periode', 'seances', 'minutes',
+        'series', 'volume', 'tonnage'
+    ]
+    list_filter = ['periode', 'debut_periode']
+    search_fields = ['utilisateur__email', 'utilisateur__prenom', 'utilisateur__nom']
+    ordering = ['-debut_periode']
+    list_select_related = ['utilisateur']
+
+
+@admin.register(AgregatMachine)
+class AgregatMachineAdmin(admin.ModelAdmin):
+    list_display = [
+        'utilisateur', 'periode', 'debut_periode', 'machine', 'exercices',
+        'series', 'volume', 'tonnage'
+    ]
+    list_filter = ['periode', 'debut_periode']
+    search_fields = ['utilisateur__email', 'machine__nom']
+    ordering = ['-debut_periode']
+    list_select_related = ['utilisateur', 'machine']
+
+
+@admin.register(AgregatGroupeMusculaire)
+class AgregatGroupeMusculaireAdmin(admin.ModelAdmin):
+    list_display = [
+        'utilisateur', 'periode', 'debut_periode', 'groupe_musculaire',
+        'series', 'volume', 'tonnage'
+    ]
+    list_filter = ['periode', 'debut_periode', 'groupe_musculaire']
+    search_fields = ['utilisateur__email']
+    ordering = ['-debut_periode']
+    list_select_related = ['utilisateur', 'groupe_musculaire']
@@ -0,0 +1,297 @@
+"""
+Analyses vectorisées des séries d'entraînement (NumPy).
+
+Les séries sont chargées une seule fois sous forme de colonnes (machine,
+horodatage, poids, répétitions) ; les estimations de 1RM, le tonnage, le
+volume et les records par machine sont ensuite calculés sur les tableaux
+entiers, sans boucle Python par ligne.
+
+Les séries temporelles de progression sont agrégées par période en base,
+puis sous-échantillonnées au nombre de points demandé.
+"""
+import numpy as np
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Max, Q, Sum
+from django.db.models.functions import Cast, TruncDay, TruncMonth, TruncWeek
+
+from .models import SeriExercice
+
+
+class ColonnesSeries:
+    """Séries réalisées sous forme de tableaux NumPy alignés, dans l'ordre chronologique"""
+
+    def __init__(self, machine, horodatage, poids, repetitions):
+        self.machine = machine
+        self.horodatage = horodatage
+        self.poids = poids
+        self.repetitions = repetitions
+
+    def __len__(self):
+        return len(self.machine)
+
+    @classmethod
+    def depuis_queryset(cls, series):
+        """
+        Charge un queryset de SeriExercice (par exemple les séries d'un
+        utilisateur, ou de toute la salle pour un traitement par lots)
+        """
+        lignes = list(
+            series.filter(repetitions_realisees__gt=0).order_by(
+                'exercice__seance__date_debut', 'exercice_id', 'numero_serie'
+            ).values_list(
+                'exercice__machine_id', 'exercice__seance__date_debut',
+                'poids_utilise', 'repetitions_realisees'
+            )
+        )
+        if not lignes:
+            return cls(
+                np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0)
+            )
+
+        machines, dates, poids, repetitions = zip(*lignes)
+        return cls(
+            np.array(machines, dtype=np.int64),
+            np.array([date.timestamp() if date else np.nan for date in dates]),
+            np.array(poids, dtype=float),  # None devient NaN
+            np.array(repetitions, dtype=float),
+        )
+
+    @classmethod
+    def pour_utilisateur(cls, utilisateur):
+        """Séries des séances terminées d'un utilisateur"""
+        return cls.depuis_queryset(SeriExercice.objects.filter(
+            exercice__seance__utilisateur=utilisateur,
+            exercice__seance__statut='TERMINEE'
+        ))
+
+
+def un_rm_brzycki(poids, repetitions):
+    """
+    1RM estimé avec la formule de Brzycki : poids × 36 / (37 - reps).
+    Même résultat que ExerciceSeance.calculer_1rm_brzycki ; NaN lorsque
+    la formule ne s'applique pas.
+    """
+    poids = np.asarray(poids, dtype=float)
+    repetitions = np.asarray(repetitions, dtype=float)
+    valide = (poids > 0) & (repetitions > 0) & (repetitions < 37)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultat = np.round(poids * (36 / (37 - repetitions)), 2)
+    return np.where(valide, resultat, np.nan)
+
+
+def un_rm_epley(poids, repetitions):
+    """1RM estimé avec la formule d'Epley : poids × (1 + reps / 30), le poids pour 1 rep"""
+    poids = np.asarray(poids, dtype=float)
+    repetitions = np.asarray(repetitions, dtype=float)
+    valide = (poids > 0) & (repetitions > 0)
+    resultat = np.where(repetitions == 1, poids, np.round(poids * (1 + repetitions / 30), 2))
+    return np.where(valide, resultat, np.nan)
+
+
+def tonnage(poids, repetitions):
+    """Charge soulevée par série (poids × répétitions), 0 sans poids"""
+    return np.nan_to_num(np.asarray(poids, dtype=float)) * np.asarray(repetitions, dtype=float)
+
+
+def meilleur_glissant_par_machine(machine, valeurs):
+    """
+    Meilleure valeur atteinte jusqu'ici sur chaque machine, pour chaque
+    série (les séries sont supposées dans l'ordre chronologique). Les
+    valeurs absentes (NaN) comptent pour 0.
+    """
+    valeurs = np.nan_to_num(np.asarray(valeurs, dtype=float))
+    if not len(valeurs):
+        return valeurs
+
+    # Tri stable par machine : l'ordre chronologique est conservé dans chaque groupe
+    ordre = np.argsort(machine, kind='stable')
+    _, groupes = np.unique(machine[ordre], return_inverse=True)
+
+    # Un décalage par groupe empêche le maximum cumulé de déborder d'une machine à l'autre
+    decalage = groupes * (valeurs.max() + 1)
+    cumul = np.maximum.accumulate(valeurs[ordre] + decalage) - decalage
+
+    resultat = np.empty_like(valeurs)
+    resultat[ordre] = cumul
+    return resultat
+
+
+def resume_par_machine(colonnes):
+    """
+    Indicateurs par machine : nombre de séries, volume (répétitions),
+    tonnage, meilleurs 1RM (Brzycki et Epley) et nombre de records battus
+    """
+    if not len(colonnes):
+        return []
+
+    rm_brzycki = un_rm_brzycki(colonnes.poids, colonnes.repetitions)
+    rm_epley = un_rm_epley(colonnes.poids, colonnes.repetitions)
+    tonnages = tonnage(colonnes.poids, colonnes.repetitions)
+
+    machines, groupes = np.unique(colonnes.machine, return_inverse=True)
+    nombre_groupes = len(machines)
+
+    def maximum_par_groupe(valeurs):
+        maxima = np.full(nombre_groupes, -np.inf)
+        np.fmax.at(maxima, groupes, valeurs)
+        return np.where(np.isfinite(maxima), maxima, np.nan)
+
+    # Un record est une série qui dépasse le meilleur 1RM précédent sur la machine
+    ordre = np.argsort(colonnes.machine, kind='stable')
+    meilleurs = meilleur_glissant_par_machine(colonnes.machine, rm_brzycki)[ordre]
+    debut_machine = np.r_[True, colonnes.machine[ordre][1:] != colonnes.machine[ordre][:-1]]
+    precedents = np.where(debut_machine, 0, np.r_[0, meilleurs[:-1]])
+    nouveaux_records = np.bincount(
+        groupes[ordre], weights=meilleurs > precedents, minlength=nombre_groupes
+    )
+
+    series = np.bincount(groupes, minlength=nombre_groupes)
+    volume = np.bincount(groupes, weights=colonnes.repetitions, minlength=nombre_groupes)
+    tonnage_total = np.bincount(groupes, weights=tonnages, minlength=nombre_groupes)
+    meilleur_brzycki = maximum_par_groupe(rm_brzycki)
+    meilleur_epley = maximum_par_groupe(rm_epley)
+
+    def nombre(valeur):
+        return None if np.isnan(valeur) else round(float(valeur), 2)
+
+    return [
+        {
+            'machine_id': int(machines[i]),
+            'series': int(series[i]),
+            'volume': int(volume[i]),
+            'tonnage': round(float(tonnage_total[i]), 2),
+            'meilleur_1rm_brzycki': nombre(meilleur_brzycki[i]),
+            'meilleur_1rm_epley': nombre(meilleur_epley[i]),
+            'nombre_records': int(nouveaux_records[i]),
+        }
+        for i in range(nombre_groupes)
+    ]
+
+
+def metriques_par_exercice(exercice, poids, repetitions, effort, poids_exercice):
+    """
+    Métriques de chaque exercice calculées sur les colonnes de ses séries
+    (mêmes règles que ExerciceSeance.calculer_metriques_series) : tonnage
+    des séries réalisées (None sans série réalisée), meilleure série selon
+    son 1RM estimé (1RM, poids, répétitions) et RPE moyen. Le 1RM d'une
+    série sans poids utilise `poids_exercice`, le poids de son exercice.
+    Retourne {exercice_id: (tonnage, meilleure série, effort moyen)}.
+    """
+    exercice = np.asarray(exercice, dtype=np.int64)
+    if not len(exercice):
+        return {}
+    poids = np.asarray(poids, dtype=float)
+    repetitions = np.asarray(repetitions, dtype=float)
+    effort = np.asarray(effort, dtype=float)
+
+    exercices, groupes = np.unique(exercice, return_inverse=True)
+    nombre_groupes = len(exercices)
+
+    realisees = repetitions > 0  # NaN (répétitions absentes) compte comme non réalisée
+    tonnages = np.bincount(
+        groupes, weights=np.where(realisees, tonnage(poids, repetitions), 0), minlength=nombre_groupes
+    )
+    nombre_realisees = np.bincount(groupes, weights=realisees, minlength=nombre_groupes)
+
+    avec_effort = ~np.isnan(effort)
+    somme_efforts = np.bincount(groupes, weights=np.nan_to_num(effort), minlength=nombre_groupes)
+    nombre_efforts = np.bincount(groupes, weights=avec_effort, minlength=nombre_groupes)
+
+    # Meilleure série : plus grand 1RM de l'exercice, la première en cas d'égalité
+    rm = un_rm_brzycki(
+        np.where(np.isnan(poids), np.asarray(poids_exercice, dtype=float), poids), repetitions
+    )
+    candidates = np.flatnonzero(~np.isnan(rm))
+    ordre = candidates[np.lexsort((candidates, -rm[candidates], groupes[candidates]))]
+    premieres = ordre[np.r_[True, groupes[ordre][1:] != groupes[ordre][:-1]]] if len(ordre) else ordre
+    meilleures = {
+        int(groupes[i]): (float(rm[i]), None if np.isnan(poids[i]) else float(poids[i]), int(repetitions[i]))
+        for i in premieres
+    }
+
+    return {
+        int(exercices[i]): (
+            float(tonnages[i]) if nombre_realisees[i] else None,
+            meilleures.get(i),
+            round(float(somme_efforts[i] / nombre_efforts[i]), 2) if nombre_efforts[i] else None,
+        )
+        for i in range(nombre_groupes)
+    }
+
+
+# Regroupements temporels disponibles pour les séries de progression
+PERIODES = {
+    'jour': TruncDay,
+    'semaine': TruncWeek,
+    'mois': TruncMonth,
+}
+
+
+def serie_temporelle(utilisateur, machine_id, periode='semaine'):
+    """
+    Progression d'un utilisateur sur une machine, agrégée en base par
+    période : meilleur 1RM estimé (Brzycki), série la plus lourde, volume
+    (répétitions), tonnage et nombre de séries
+    """
+    repetitions = Cast('repetitions_realisees', FloatField())
+    un_rm = ExpressionWrapper(F('poids_utilise') * 36.0 / (37.0 - repetitions), output_field=FloatField())
+    calculable = Q(poids_utilise__gt=0, repetitions_realisees__gt=0, repetitions_realisees__lt=37)
+
+    return list(
+        SeriExercice.objects.filter(
+            exercice__machine_id=machine_id,
+            exercice__seance__utilisateur=utilisateur,
+            exercice__seance__statut='TERMINEE',
+            exercice__seance__date_debut__isnull=False,
+            repetitions_realisees__gt=0
+        ).annotate(
+            date=PERIODES[periode]('exercice__seance__date_debut')
+        ).values('date').annotate(
+            meilleur_1rm=Max(un_rm, filter=calculable),
+            serie_max=Max('poids_utilise'),
+            volume=Sum('repetitions_realisees'),
+            tonnage=Sum(F('poids_utilise') * repetitions, output_field=FloatField()),
+            series=Count('id'),
+        ).order_by('date')
+    )
+
+
+def sous_echantillonner(points, nombre_max):
+    """
+    Réduit une série temporelle à au plus `nombre_max` points en fusionnant
+    les périodes consécutives : maxima pour le 1RM et la série la plus
+    lourde, sommes pour le volume, le tonnage et le nombre de séries.
+    Chaque point fusionné porte la date de sa première période.
+    """
+    if len(points) <= nombre_max:
+        return points
+
+    taille = -(-len(points) // nombre_max)
+    debuts = np.arange(0, len(points), taille)
+
+    def colonne(nom):
+        return np.array([point[nom] for point in points], dtype=float)
+
+    def maxima(nom):
+        valeurs = colonne(nom)
+        return np.fmax.reduceat(np.where(np.isnan(valeurs), -np.inf, valeurs), debuts)
+
+    def sommes(nom):
+        return np.add.reduceat(np.nan_to_num(colonne(nom)), debuts)
+
+    meilleur_1rm, serie_max = maxima('meilleur_1rm'), maxima('serie_max')
+    volume, tonnage_total, series = sommes('volume'), sommes('tonnage'), sommes('series')
+
+    def nombre(valeur):
+        return float(valeur) if np.isfinite(valeur) else None
+
+    return [
+        {
+            'date': points[debut]['date'],
+            'meilleur_1rm': nombre(meilleur_1rm[i]),
+            'serie_max': nombre(serie_max[i]),
+            'volume': int(volume[i]),
+            'tonnage': float(tonnage_total[i]),
+            'series': int(series[i]),
+        }
+        for i, debut in enumerate(debuts)
+    ]
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class WorkoutsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.workouts'
-    verbose_name = 'Entraînements'
\ No newline at end of file
+    verbose_name = 'Entraînements'
+
+    def ready(self):
+        from . import signals  # noqa: F401
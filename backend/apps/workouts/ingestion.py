@@ -0,0 +1,264 @@
+"""
+Enregistrement en masse des séances envoyées par l'application Android.
+
+Les séances enregistrées hors ligne sont renvoyées par lots à la
+reconnexion. Chacune porte une clé générée par l'application (cle_client) :
+une séance déjà reçue n'est pas recréée lorsqu'elle est renvoyée.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.machines.models import Machine
+from apps.machines.resolution import resoudre_machines
+from apps.users.models import User
+from .models import SeanceEntrainement, ExerciceSeance, SeriExercice, StatistiquesUtilisateur
+
+# Nombre maximal de séances acceptées dans un lot
+TAILLE_MAX_LOT = 100
+
+# Bornes d'une séance reçue : au-delà, l'élément est refusé
+DUREE_MAX = 24 * 60
+EXERCICES_MAX = 50
+SERIES_MAX = 50
+REPETITIONS_MAX = 1000
+POIDS_MAX = 1000
+DATE_MIN = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+# Statuts des éléments d'un lot
+CREEE = 'CREEE'
+DOUBLON = 'DOUBLON'
+INVALIDE = 'INVALIDE'
+
+
+def _entier(valeur, nom, minimum=0, maximum=None):
+    try:
+        valeur = int(valeur)
+    except (TypeError, ValueError):
+        raise ValueError(f"{nom} doit être un nombre entier")
+    if valeur < minimum or (maximum is not None and valeur > maximum):
+        borne = f"entre {minimum} et {maximum}" if maximum is not None else f"supérieur ou égal à {minimum}"
+        raise ValueError(f"{nom} doit être {borne}")
+    return valeur
+
+
+def _texte(valeur, nom, longueur_max=None):
+    if valeur is None:
+        return ''
+    if not isinstance(valeur, str):
+        raise ValueError(f"{nom} doit être une chaîne de caractères")
+    if longueur_max is not None and len(valeur) > longueur_max:
+        raise ValueError(f"{nom} ne doit pas dépasser {longueur_max} caractères")
+    return valeur
+
+
+def _valider(data):
+    """
+    Vérifie et normalise une séance reçue (valeurs par défaut de
+    l'application pour les champs absents). Lève ValueError si invalide.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Une séance doit être un objet JSON")
+
+    cle_client = data.get('cle_client')
+    if cle_client is not None:
+        cle_client = str(cle_client)
+        if not cle_client or len(cle_client) > 64:
+            raise ValueError("cle_client doit contenir entre 1 et 64 caractères")
+
+    duree = _entier(data.get('duree', 45), 'duree', maximum=DUREE_MAX)
+    note_ressenti = data.get('note_ressenti', 7)
+    if note_ressenti is not None:
+        note_ressenti = _entier(note_ressenti, 'note_ressenti', minimum=1, maximum=10)
+
+    date_debut = data.get('date_debut')
+    if date_debut is not None:
+        date_debut = parse_datetime(str(date_debut))
+        if date_debut is None:
+            raise ValueError("date_debut doit être une date ISO 8601")
+        if timezone.is_naive(date_debut):
+            date_debut = timezone.make_aware(date_debut)
+        # Une séance déjà réalisée (à un jour près, pour l'horloge de l'appareil)
+        if not DATE_MIN <= date_debut <= timezone.now() + timedelta(days=1):
+            raise ValueError("date_debut doit être une date passée, postérieure à l'an 2000")
+
+    exercices = data.get('exercices', [])
+    if not isinstance(exercices, list):
+        raise ValueError("exercices doit être une liste")
+    if len(exercices) > EXERCICES_MAX:
+        raise ValueError(f"Une séance ne peut pas dépasser {EXERCICES_MAX} exercices")
+
+    exercices_valides = []
+    for exercice_data in exercices:
+        if not isinstance(exercice_data, dict) or not exercice_data.get('nom'):
+            raise ValueError("Chaque exercice doit avoir un nom")
+        try:
+            poids = float(exercice_data.get('poids', 20))
+        except (TypeError, ValueError):
+            raise ValueError("poids doit être un nombre")
+        if not math.isfinite(poids) or not 0 <= poids <= POIDS_MAX:
+            raise ValueError(f"poids doit être compris entre 0 et {POIDS_MAX}")
+        exercices_valides.append({
+            'nom': _texte(exercice_data['nom'], 'nom', Machine._meta.get_field('nom').max_length),
+            'series': _entier(exercice_data.get('series', 3), 'series', maximum=SERIES_MAX),
+            'reps': _entier(exercice_data.get('reps', 10), 'reps', maximum=REPETITIONS_MAX),
+            'poids': poids,
+        })
+
+    return {
+        'cle_client': cle_client,
+        'nom': _texte(data.get('nom'), 'nom', SeanceEntrainement._meta.get_field('nom').max_length),
+        'duree': duree,
+        'date_debut': date_debut,
+        'note_ressenti': note_ressenti,
+        'commentaire': _texte(data.get('commentaire', ''), 'commentaire'),
+        'exercices': exercices_valides,
+    }
+
+
+def _construire_seance(utilisateur, data, machines, maintenant):
+    """
+    Construit en mémoire une séance terminée, ses exercices et ses séries.
+    Les métriques sont calculées en Python : bulk_create n'appelle pas save().
+    """
+    date_debut = data['date_debut'] or maintenant - timedelta(minutes=data['duree'])
+    date_fin = date_debut + timedelta(minutes=data['duree'])
+
+    exercices = []
+    series = []
+    for idx, exercice_data in enumerate(data['exercices']):
+        nombre_series = exercice_data['series']
+        repetitions = exercice_data['reps']
+        poids = exercice_data['poids']
+
+        exercice = ExerciceSeance(
+            machine_id=machines[exercice_data['nom']],
+            ordre_dans_seance=idx + 1,
+            series_prevues=nombre_series,
+            repetitions_prevues=repetitions,
+            poids_prevu=poids,
+            nombre_series=nombre_series,
+            repetitions_realisees=repetitions,
+            poids_utilise=poids,
+            statut='TERMINE'
+        )
+        series_exercice = [
+            SeriExercice(
+                exercice=exercice,
+                numero_serie=serie_num + 1,
+                repetitions_prevues=repetitions,
+                poids_prevu=poids,
+                repetitions_realisees=repetitions,
+                poids_utilise=poids,
+                statut='REUSSIE'
+            )
+            for serie_num in range(nombre_series)
+        ]
+        exercice.calculer_metriques(series_exercice)
+        exercices.append(exercice)
+        series.extend(series_exercice)
+
+    seance = SeanceEntrainement(
+        utilisateur=utilisateur,
+        nom=data['nom'] or f"Séance du {date_fin.strftime('%d/%m/%Y')}",
+        date_prevue=date_debut,
+        date_debut=date_debut,
+        date_fin=date_fin,
+        duree_prevue=data['duree'],
+        statut='TERMINEE',
+        note_ressenti=data['note_ressenti'],
+        commentaire=data['commentaire'],
+        cle_client=data['cle_client']
+    )
+    seance.duree_reelle = seance.calculer_duree_reelle()
+    seance.calculer_metriques(exercices)
+    return seance, exercices, series
+
+
+@transaction.atomic
+def enregistrer_seances_android(utilisateur, elements):
+    """
+    Enregistre un lot de séances dans une seule transaction.
+
+    Les séances valides sont insérées par lots (séances, puis exercices,
+    puis séries) ; une séance dont la clé client est déjà connue n'est pas
+    recréée. Retourne un résultat par élément, dans l'ordre reçu :
+    {'statut': CREEE | DOUBLON | INVALIDE, 'seance': ..., 'erreur': ...}.
+    """
+    resultats = []
+    valides = []
+    for data in elements:
+        try:
+            valides.append(_valider(data))
+            resultats.append({'statut': CREEE, 'seance': None, 'erreur': None})
+        except ValueError as e:
+            valides.append(None)
+            resultats.append({'statut': INVALIDE, 'seance': None, 'erreur': str(e)})
+
+    # Verrou sur l'utilisateur : deux synchronisations simultanées du même
+    # appareil ne peuvent pas insérer deux fois la même clé client
+    User.objects.select_for_update().only('id').get(pk=utilisateur.pk)
+
+    cles = {data['cle_client'] for data in valides if data and data['cle_client']}
+    connues = {
+        seance.cle_client: seance
+        for seance in SeanceEntrainement.objects.filter(utilisateur=utilisateur, cle_client__in=cles)
+    } if cles else {}
+
+    machines = resoudre_machines({
+        exercice_data['nom']
+        for data in valides if data
+        for exercice_data in data['exercices']
+    })
+
+    maintenant = timezone.now()
+    nouvelles = []
+    exercices = []
+    series = []
+    for resultat, data in zip(resultats, valides):
+        if data is None:
+            continue
+        if data['cle_client'] in connues:
+            resultat['statut'] = DOUBLON
+            resultat['seance'] = connues[data['cle_client']]
+            continue
+
+        seance, exercices_seance, series_seance = _construire_seance(utilisateur, data, machines, maintenant)
+        if data['cle_client']:
+            connues[data['cle_client']] = seance
+        resultat['seance'] = seance
+        nouvelles.append((seance, exercices_seance))
+        exercices.extend(exercices_seance)
+        series.extend(series_seance)
+
+    if nouvelles:
+        # Construit les statistiques depuis l'historique avant l'insertion :
+        # chaque nouvelle séance y est ensuite ajoutée une seule fois
+        StatistiquesUtilisateur.pour_utilisateur(utilisateur)
+
+    SeanceEntrainement.objects.bulk_create([seance for seance, _ in nouvelles])
+    for seance, exercices_seance in nouvelles:
+        for exercice in exercices_seance:
+            exercice.seance = seance
+    ExerciceSeance.objects.bulk_create(exercices)
+    SeriExercice.objects.bulk_create(series)
+
+    # Dans l'ordre chronologique, pour que les progressions s'enchaînent
+    for seance, _ in sorted(nouvelles, key=lambda nouvelle: nouvelle[0].date_debut):
+        seance.mettre_a_jour_donnees_derivees()
+
+    return resultats
+
+
+def enregistrer_seance_android(utilisateur, data):
+    """
+    Crée une séance terminée avec ses exercices et séries.
+    Une séance déjà reçue (même clé client) est retournée sans être recréée.
+    """
+    resultat, = enregistrer_seances_android(utilisateur, [data])
+    if resultat['erreur']:
+        raise ValueError(resultat['erreur'])
+    return resultat['seance']
@@ -0,0 +1,130 @@
+"""
+Compare la sérialisation rapide des séances aux serializers DRF.
+
+Les données de mesure sont créées dans une transaction annulée à la fin :
+la base n'est pas modifiée.
+
+    python manage.py benchmark_serialisation --seances 1000
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from apps.machines.models import Machine, CategorieMachine, GroupeMusculaire
+from apps.users.models import User
+from apps.workouts.models import SeanceEntrainement, ExerciceSeance, SeriExercice
+from apps.workouts.pagination import ORDRE_HISTORIQUE
+from apps.workouts.serialisation_rapide import serialiser_seances
+from apps.workouts.serializers import SeanceEntrainementSerializer
+
+
+class Command(BaseCommand):
+    help = "Mesure la sérialisation rapide des séances face aux serializers DRF"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seances', type=int, default=1000)
+        parser.add_argument('--exercices', type=int, default=5, help="Exercices par séance")
+        parser.add_argument('--series', type=int, default=4, help="Séries par exercice")
+        parser.add_argument('--repetitions', type=int, default=3, help="Mesures par chemin")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            utilisateur = self._creer_donnees(options)
+            seances = SeanceEntrainement.objects.filter(
+                utilisateur=utilisateur
+            ).order_by(*ORDRE_HISTORIQUE)
+
+            renderer = JSONRenderer()
+            serializers_drf = lambda: renderer.render(SeanceEntrainementSerializer(
+                seances.select_related('mode_entrainement').prefetch_related(Prefetch(
+                    'exercices',
+                    queryset=ExerciceSeance.objects.select_related('variante', 'machine').prefetch_related(
+                        'machine__groupes_musculaires_primaires', 'series'
+                    )
+                )),
+                many=True
+            ).data)
+            rapide = lambda: renderer.render(serialiser_seances(seances))
+
+            duree_drf, json_drf = self._mesurer(serializers_drf, options['repetitions'])
+            duree_rapide, json_rapide = self._mesurer(rapide, options['repetitions'])
+
+            transaction.set_rollback(True)
+
+        if json_drf != json_rapide:
+            raise CommandError("Les deux sérialisations ne produisent pas le même JSON")
+
+        self.stdout.write(f"{options['seances']} séances, {len(json_drf)} octets (JSON identique)")
+        self.stdout.write(f"  Serializers DRF      : {duree_drf * 1000:.0f} ms")
+        self.stdout.write(f"  Sérialisation rapide : {duree_rapide * 1000:.0f} ms")
+        self.stdout.write(self.style.SUCCESS(f"  Gain : x{duree_drf / duree_rapide:.1f}"))
+
+    def _mesurer(self, fonction, repetitions):
+        """Meilleure durée sur plusieurs exécutions, avec le résultat produit"""
+        meilleure = None
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            resultat = fonction()
+            duree = time.perf_counter() - debut
+            meilleure = duree if meilleure is None else min(meilleure, duree)
+        return meilleure, resultat
+
+    def _creer_donnees(self, options):
+        """Utilisateur fictif avec ses séances, exercices et séries"""
+        utilisateur = User.objects.create_user(
+            username='benchmark@basicfit.local', email='benchmark@basicfit.local',
+            password=None, prenom='Benchmark', nom='Serialisation'
+        )
+        categorie, _ = CategorieMachine.objects.get_or_create(nom='MUSCULATION')
+        groupe, _ = GroupeMusculaire.objects.get_or_create(nom='Pectoraux')
+        machines = []
+        for numero in range(options['exercices']):
+            machine = Machine.objects.create(
+                nom=f"Machine benchmark {numero + 1}", description='-', instructions='-',
+                categorie=categorie
+            )
+            machine.groupes_musculaires_primaires.add(groupe)
+            machines.append(machine)
+
+        maintenant = timezone.now()
+        seances = SeanceEntrainement.objects.bulk_create([
+            SeanceEntrainement(
+                utilisateur=utilisateur,
+                nom=f"Séance {numero + 1}",
+                date_prevue=maintenant - timedelta(days=numero),
+                date_debut=maintenant - timedelta(days=numero),
+                date_fin=maintenant - timedelta(days=numero) + timedelta(minutes=50),
+                duree_reelle=50,
+                statut='TERMINEE',
+                note_ressenti=7
+            )
+            for numero in range(options['seances'])
+        ])
+
+        exercices = ExerciceSeance.objects.bulk_create([
+            ExerciceSeance(
+                seance=seance, machine=machine, ordre_dans_seance=ordre + 1,
+                series_prevues=options['series'], repetitions_prevues=10, poids_prevu=40.0,
+                nombre_series=options['series'], repetitions_realisees=10, poids_utilise=42.5,
+                volume_total=10 * options['series'], tonnage_total=425.0 * options['series'],
+                statut='TERMINE'
+            )
+            for seance in seances
+            for ordre, machine in enumerate(machines)
+        ])
+
+        SeriExercice.objects.bulk_create([
+            SeriExercice(
+                exercice=exercice, numero_serie=numero + 1, repetitions_prevues=10,
+                poids_prevu=40.0, repetitions_realisees=10, poids_utilise=42.5,
+                statut='REUSSIE', note_effort=7
+            )
+            for exercice in exercices
+            for numero in range(options['series'])
+        ])
+        return utilisateur
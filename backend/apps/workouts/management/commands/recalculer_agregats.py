@@ -0,0 +1,34 @@
+"""
+Reconstruit les agrégats par période (semaine, mois) depuis l'historique.
+
+À lancer après leur création, puis en cas de correction de données
+(séances supprimées ou modifiées après coup).
+
+    python manage.py recalculer_agregats
+    python manage.py recalculer_agregats --utilisateur 12 --utilisateur 15
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.workouts.recalcul import recalculer_agregats
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats d'entraînement par semaine et par mois"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--utilisateur', type=int, action='append', dest='utilisateurs',
+            help="Limiter à un utilisateur (option répétable)"
+        )
+        parser.add_argument(
+            '--taille-lot', type=int, default=2000,
+            help="Lignes lues et écrites par requête"
+        )
+
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        nombre = recalculer_agregats(options['utilisateurs'], taille_lot=options['taille_lot'])
+        duree = time.perf_counter() - debut
+        self.stdout.write(self.style.SUCCESS(f"{nombre} agrégats recalculés en {duree:.1f} s"))
@@ -0,0 +1,45 @@
+"""
+Recalcule les métriques des exercices à partir de leurs séries (tonnage
+exact, meilleure série, 1RM estimé par série, RPE moyen), puis les totaux
+des séances.
+
+À lancer une fois après l'ajout de ces métriques, puis recalculer_agregats
+(les agrégats cumulent le tonnage des exercices).
+
+    python manage.py recalculer_metriques_series
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.workouts.models import SeanceEntrainement, ExerciceSeance
+
+
+class Command(BaseCommand):
+    help = "Recalcule les métriques des exercices depuis leurs séries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot', type=int, default=500,
+            help="Séances traitées par transaction"
+        )
+
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        seance_ids = list(SeanceEntrainement.objects.order_by('id').values_list('id', flat=True))
+        taille = options['taille_lot']
+
+        nombre_exercices = 0
+        for i in range(0, len(seance_ids), taille):
+            lot = seance_ids[i:i + taille]
+            with transaction.atomic():
+                nombre_exercices += len(
+                    ExerciceSeance.objects.filter(seance_id__in=lot).recalculer_metriques_series()
+                )
+                SeanceEntrainement.objects.filter(id__in=lot).recalculer_metriques()
+
+        duree = time.perf_counter() - debut
+        self.stdout.write(self.style.SUCCESS(
+            f"{nombre_exercices} exercices de {len(seance_ids)} séances recalculés en {duree:.1f} s"
+        ))
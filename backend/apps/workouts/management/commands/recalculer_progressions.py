@@ -0,0 +1,82 @@
+"""
+Reconstruit toutes les progressions sur machines depuis l'historique des séances.
+
+Les utilisateurs sont répartis en lots traités en parallèle par un pool de
+processus ; chaque lot lit ses performances en flux et écrit ses
+progressions par lots.
+
+    python manage.py recalculer_progressions --processus 4
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.workouts.models import SeanceEntrainement, ProgressionMachine
+from apps.workouts.recalcul import recalculer_progressions
+
+
+class Command(BaseCommand):
+    help = "Recalcule toutes les progressions sur machines depuis l'historique"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processus', type=int, default=os.cpu_count() or 1,
+            help="Nombre de processus (1 : traitement dans le processus courant)"
+        )
+        parser.add_argument(
+            '--utilisateurs-par-lot', type=int, default=100,
+            help="Nombre d'utilisateurs traités par tâche"
+        )
+        parser.add_argument(
+            '--taille-lot', type=int, default=2000,
+            help="Lignes lues et écrites par requête"
+        )
+
+    def handle(self, *args, **options):
+        utilisateur_ids = sorted(
+            set(SeanceEntrainement.objects.filter(statut='TERMINEE').values_list('utilisateur_id', flat=True))
+            | set(ProgressionMachine.objects.values_list('utilisateur_id', flat=True))
+        )
+        processus = options['processus']
+        if connections['default'].vendor == 'sqlite':
+            # SQLite n'accepte qu'un écrivain à la fois
+            processus = 1
+
+        taille = options['utilisateurs_par_lot']
+        partitions = [utilisateur_ids[i:i + taille] for i in range(0, len(utilisateur_ids), taille)]
+        tache = partial(recalculer_progressions, taille_lot=options['taille_lot'])
+
+        self.stdout.write(
+            f"{len(utilisateur_ids)} utilisateurs en {len(partitions)} lots, "
+            f"{processus} processus"
+        )
+        debut = time.perf_counter()
+
+        if processus <= 1 or len(partitions) <= 1:
+            resultats = map(tache, partitions)
+            self._suivre(resultats, len(partitions), debut)
+        else:
+            # Chaque processus ouvre ses propres connexions à la base
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=processus, initializer=django.setup) as pool:
+                self._suivre(pool.map(tache, partitions), len(partitions), debut)
+
+    def _suivre(self, resultats, nombre_lots, debut):
+        """Affiche l'avancement lot par lot, puis le débit global"""
+        performances = series = progressions = 0
+        for numero, (lot_performances, lot_series, lot_progressions) in enumerate(resultats, start=1):
+            performances += lot_performances
+            series += lot_series
+            progressions += lot_progressions
+            self.stdout.write(f"  Lot {numero}/{nombre_lots} : {series} séries traitées")
+
+        duree = max(time.perf_counter() - debut, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{progressions} progressions recalculées à partir de {performances} exercices "
+            f"et {series} séries en {duree:.1f} s ({series / duree:.0f} séries/s)"
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('workouts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiquesUtilisateur',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('utilisateur', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistiques_entrainement', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('total_seances', models.PositiveIntegerField(default=0, verbose_name='Séances terminées')),
+                ('total_minutes', models.PositiveIntegerField(default=0, verbose_name="Minutes d'entraînement")),
+                ('seances_excellentes', models.PositiveIntegerField(default=0, help_text='Séances dont au moins 80% des exercices sont notés 8 ou plus', verbose_name='Séances excellentes')),
+                ('record_poids', models.FloatField(default=0.0, verbose_name='Record de poids (kg)')),
+                ('compteur_machines', models.JSONField(blank=True, default=dict, help_text="Nombre d'exercices réalisés par machine", verbose_name='Compteur par machine')),
+                ('exercices_favoris', models.JSONField(blank=True, default=list, verbose_name='Exercices favoris')),
+                ('progression_generale', models.FloatField(default=0.0, help_text='Moyenne des progressions de poids sur les machines', verbose_name='Progression générale (kg)')),
+            ],
+            options={
+                'verbose_name': 'Statistiques utilisateur',
+                'verbose_name_plural': 'Statistiques utilisateurs',
+            },
+        ),
+    ]
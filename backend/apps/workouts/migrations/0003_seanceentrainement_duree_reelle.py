@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:26
+
+from django.db import migrations, models
+
+
+def calculer_durees_reelles(apps, schema_editor):
+    """Renseigne la durée réelle des séances existantes"""
+    SeanceEntrainement = apps.get_model('workouts', 'SeanceEntrainement')
+    seances = SeanceEntrainement.objects.filter(
+        date_debut__isnull=False, date_fin__isnull=False
+    ).only('id', 'date_debut', 'date_fin')
+
+    lot = []
+    for seance in seances.iterator(chunk_size=1000):
+        delta = seance.date_fin - seance.date_debut
+        seance.duree_reelle = max(0, int(delta.total_seconds() / 60))
+        lot.append(seance)
+        if len(lot) >= 1000:
+            SeanceEntrainement.objects.bulk_update(lot, ['duree_reelle'])
+            lot = []
+    if lot:
+        SeanceEntrainement.objects.bulk_update(lot, ['duree_reelle'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0002_statistiquesutilisateur'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seanceentrainement',
+            name='duree_reelle',
+            field=models.PositiveIntegerField(blank=True, db_index=True, help_text='Durée réelle en minutes, calculée à partir des dates de début et de fin', null=True, verbose_name='Durée réelle (min)'),
+        ),
+        migrations.RunPython(calculer_durees_reelles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0003_seanceentrainement_duree_reelle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seanceentrainement',
+            index=models.Index(fields=['utilisateur', 'date_debut', 'id'], name='workouts_se_utilisa_70b824_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('machines', '0003_index_updated_at'),
+        ('workouts', '0004_index_historique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregatPeriode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('SEMAINE', 'Semaine'), ('MOIS', 'Mois')], max_length=10, verbose_name='Période')),
+                ('debut_periode', models.DateField(help_text='Lundi de la semaine ou premier jour du mois', verbose_name='Début de période')),
+                ('exercices', models.PositiveIntegerField(default=0, verbose_name='Exercices')),
+                ('series', models.PositiveIntegerField(default=0, verbose_name='Séries')),
+                ('volume', models.PositiveIntegerField(default=0, help_text='Répétitions réalisées', verbose_name='Volume (répétitions)')),
+                ('tonnage', models.FloatField(default=0.0, verbose_name='Tonnage (kg)')),
+                ('seances', models.PositiveIntegerField(default=0, verbose_name='Séances terminées')),
+                ('minutes', models.PositiveIntegerField(default=0, verbose_name="Minutes d'entraînement")),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Agrégat par période',
+                'verbose_name_plural': 'Agrégats par période',
+                'ordering': ['utilisateur', 'periode', '-debut_periode'],
+                'unique_together': {('utilisateur', 'periode', 'debut_periode')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AgregatMachine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('SEMAINE', 'Semaine'), ('MOIS', 'Mois')], max_length=10, verbose_name='Période')),
+                ('debut_periode', models.DateField(help_text='Lundi de la semaine ou premier jour du mois', verbose_name='Début de période')),
+                ('exercices', models.PositiveIntegerField(default=0, verbose_name='Exercices')),
+                ('series', models.PositiveIntegerField(default=0, verbose_name='Séries')),
+                ('volume', models.PositiveIntegerField(default=0, help_text='Répétitions réalisées', verbose_name='Volume (répétitions)')),
+                ('tonnage', models.FloatField(default=0.0, verbose_name='Tonnage (kg)')),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='machines.machine', verbose_name='Machine')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Agrégat par machine',
+                'verbose_name_plural': 'Agrégats par machine',
+                'ordering': ['utilisateur', 'periode', '-debut_periode', 'machine'],
+                'unique_together': {('utilisateur', 'periode', 'debut_periode', 'machine')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AgregatGroupeMusculaire',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('periode', models.CharField(choices=[('SEMAINE', 'Semaine'), ('MOIS', 'Mois')], max_length=10, verbose_name='Période')),
+                ('debut_periode', models.DateField(help_text='Lundi de la semaine ou premier jour du mois', verbose_name='Début de période')),
+                ('exercices', models.PositiveIntegerField(default=0, verbose_name='Exercices')),
+                ('series', models.PositiveIntegerField(default=0, verbose_name='Séries')),
+                ('volume', models.PositiveIntegerField(default=0, help_text='Répétitions réalisées', verbose_name='Volume (répétitions)')),
+                ('tonnage', models.FloatField(default=0.0, verbose_name='Tonnage (kg)')),
+                ('groupe_musculaire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='machines.groupemusculaire', verbose_name='Groupe musculaire')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Agrégat par groupe musculaire',
+                'verbose_name_plural': 'Agrégats par groupe musculaire',
+                'ordering': ['utilisateur', 'periode', '-debut_periode', 'groupe_musculaire'],
+                'unique_together': {('utilisateur', 'periode', 'debut_periode', 'groupe_musculaire')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('workouts', '0005_agregats_periodes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seanceentrainement',
+            name='cle_client',
+            field=models.CharField(blank=True, help_text="Identifiant généré par l'application, unique par utilisateur (synchronisation hors ligne)", max_length=64, null=True, verbose_name='Clé client'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='seanceentrainement',
+            unique_together={('utilisateur', 'cle_client')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0006_seance_cle_client'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exerciceseance',
+            name='effort_moyen',
+            field=models.FloatField(blank=True, help_text="Moyenne des notes d'effort (RPE) des séries", null=True, verbose_name='RPE moyen'),
+        ),
+        migrations.AddField(
+            model_name='exerciceseance',
+            name='meilleur_1rm_serie',
+            field=models.FloatField(blank=True, help_text='Plus haut 1RM estimé (Brzycki) parmi les séries', null=True, verbose_name='1RM estimé de la meilleure série (kg)'),
+        ),
+        migrations.AddField(
+            model_name='exerciceseance',
+            name='meilleure_serie_poids',
+            field=models.FloatField(blank=True, help_text='Poids de la série au meilleur 1RM estimé', null=True, verbose_name='Meilleure série - poids (kg)'),
+        ),
+        migrations.AddField(
+            model_name='exerciceseance',
+            name='meilleure_serie_repetitions',
+            field=models.PositiveIntegerField(blank=True, help_text='Répétitions de la série au meilleur 1RM estimé', null=True, verbose_name='Meilleure série - répétitions'),
+        ),
+    ]
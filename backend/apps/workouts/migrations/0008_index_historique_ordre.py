@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:01
+
+import apps.workouts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0007_metriques_series'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='seanceentrainement',
+            name='workouts_se_utilisa_70b824_idx',
+        ),
+        migrations.AddIndex(
+            model_name='seanceentrainement',
+            index=apps.workouts.models.IndexOrdonne(models.F('utilisateur'), models.OrderBy(models.F('date_debut'), descending=True, nulls_last=True), models.OrderBy(models.F('id'), descending=True), name='seance_historique_idx'),
+        ),
+    ]
@@ -2,20 +2,149 @@
 Modèles pour les séances d'entraînement et la progression dans BasicFit
 """
 import math
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import (
+    Avg, Case, Count, F, FloatField, IntegerField, Max, OrderBy, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
+from apps.core.cache_utilisateur import incrementer_version_utilisateur
 from apps.core.models import TimeStampedModel
 from apps.users.models import User
-from apps.machines.models import Machine, VarianteMachine
+from apps.machines.models import GroupeMusculaire, Machine, VarianteMachine
 from apps.core.models import ModeEntrainement
 
 
+class IndexOrdonne(models.Index):
+    """
+    Index sur des expressions ordonnées, avec NULLS FIRST/LAST sur PostgreSQL.
+    SQLite refuse ces modificateurs dans un index ; il y range déjà les NULL
+    en premier en ordre croissant et en dernier en ordre décroissant.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'sqlite':
+            expressions = [
+                OrderBy(expression.expression, descending=expression.descending)
+                if isinstance(expression, OrderBy) else expression
+                for expression in self.expressions
+            ]
+            return models.Index(*expressions, name=self.name).create_sql(
+                model, schema_editor, using, **kwargs
+            )
+        return super().create_sql(model, schema_editor, using, **kwargs)
+
+
+class SeanceEntrainementQuerySet(models.QuerySet):
+    """QuerySet des séances avec des indicateurs calculés en base"""
+
+    def avec_taux_excellence(self):
+        """
+        Annote chaque séance avec son nombre d'exercices, son nombre
+        d'exercices bien notés et le ratio entre les deux
+        """
+        return self.annotate(
+            total_exercices=Count('exercices'),
+            exercices_excellents=Count(
+                'exercices',
+                filter=Q(exercices__note_ressenti__gte=SeanceEntrainement.SEUIL_NOTE_EXCELLENTE)
+            ),
+        ).annotate(
+            taux_excellence=Case(
+                When(total_exercices=0, then=Value(None)),
+                default=(
+                    Cast('exercices_excellents', FloatField())
+                    / Cast('total_exercices', FloatField())
+                ),
+                output_field=FloatField()
+            )
+        )
+
+    def excellentes(self):
+        """Séances dont au moins 80% des exercices sont notés 8 ou plus"""
+        return self.avec_taux_excellence().filter(
+            taux_excellence__gte=SeanceEntrainement.RATIO_SEANCE_EXCELLENTE
+        )
+
+    def nombre_excellentes(self):
+        """Compte les séances excellentes en une seule requête"""
+        return self.excellentes().count()
+
+    def statistiques_durees(self):
+        """Somme, moyenne et maximum des durées réelles, calculés en base"""
+        return self.aggregate(
+            total=Sum('duree_reelle'),
+            moyenne=Avg('duree_reelle'),
+            maximum=Max('duree_reelle')
+        )
+
+    def resume_activite(self):
+        """
+        Nombre de séances terminées, dont celles de la semaine en cours
+        (depuis lundi), et date de la dernière, en une seule requête
+        """
+        maintenant = timezone.localtime()
+        debut_semaine = (maintenant - timedelta(days=maintenant.weekday())).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        return self.filter(statut='TERMINEE').aggregate(
+            total_seances=Count('id'),
+            seances_cette_semaine=Count('id', filter=Q(date_debut__gte=debut_semaine)),
+            derniere_seance=Max('date_debut')
+        )
+
+    def recalculer_metriques(self):
+        """
+        Recalcule en une seule requête UPDATE le nombre d'exercices et de
+        séries, le volume et le tonnage de toutes les séances du queryset,
+        à partir de leurs exercices. Retourne le nombre de séances mises à jour.
+        """
+        exercices = ExerciceSeance.objects.filter(
+            seance=OuterRef('pk')
+        ).values('seance').order_by()
+
+        def total(agregat, output_field):
+            return Coalesce(
+                Subquery(exercices.annotate(total=agregat).values('total')),
+                Value(0, output_field=output_field),
+                output_field=output_field
+            )
+
+        utilisateur_ids = set(self.values_list('utilisateur_id', flat=True).order_by())
+        nombre = self.update(
+            nombre_exercices=total(Count('id'), IntegerField()),
+            nombre_series_totales=total(Sum('nombre_series'), IntegerField()),
+            volume_total=total(Sum('volume_total'), FloatField()),
+            tonnage_total=total(Sum('tonnage_total'), FloatField()),
+            updated_at=timezone.now()
+        )
+        # update() n'envoie pas de signaux
+        for utilisateur_id in utilisateur_ids:
+            incrementer_version_utilisateur(utilisateur_id)
+        return nombre
+
+    def histogramme_durees(self, tranche=15):
+        """Nombre de séances par tranche de durée réelle (en minutes)"""
+        return list(
+            self.filter(duree_reelle__isnull=False)
+            .annotate(tranche_duree=F('duree_reelle') / tranche * tranche)
+            .values('tranche_duree')
+            .annotate(nombre=Count('id'))
+            .order_by('tranche_duree')
+        )
+
+
 class SeanceEntrainement(TimeStampedModel):
     """
     Modèle pour une séance d'entraînement complète
     """
+    SEUIL_NOTE_EXCELLENTE = 8
+    RATIO_SEANCE_EXCELLENTE = 0.8
+
     STATUTS_SEANCE = [
         ('PLANIFIEE', 'Planifiée'),
         ('EN_COURS', 'En cours'),
@@ -65,6 +194,13 @@ class SeanceEntrainement(TimeStampedModel):
         help_text="Durée prévue en minutes",
         verbose_name="Durée prévue (min)"
     )
+    duree_reelle = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Durée réelle en minutes, calculée à partir des dates de début et de fin",
+        verbose_name="Durée réelle (min)"
+    )
 
     # Statut et métriques
     statut = models.CharField(
@@ -149,14 +285,29 @@ class SeanceEntrainement(TimeStampedModel):
         help_text="Température en degrés Celsius",
         verbose_name="Température (°C)"
     )
+    cle_client = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="Identifiant généré par l'application, unique par utilisateur (synchronisation hors ligne)",
+        verbose_name="Clé client"
+    )
+
+    objects = SeanceEntrainementQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Séance d'entraînement"
         verbose_name_plural = "Séances d'entraînement"
         ordering = ['-date_prevue']
+        unique_together = ['utilisateur', 'cle_client']
         indexes = [
             models.Index(fields=['utilisateur', 'date_prevue']),
             models.Index(fields=['statut']),
+            # Ordre de l'historique (pagination.ORDRE_HISTORIQUE)
+            IndexOrdonne(
+                F('utilisateur'), F('date_debut').desc(nulls_last=True), F('id').desc(),
+                name='seance_historique_idx'
+            ),
         ]
 
     def __str__(self):
@@ -164,14 +315,21 @@ class SeanceEntrainement(TimeStampedModel):
             return f"{self.nom} - {self.date_prevue.strftime('%d/%m/%Y')}"
         return f"Séance du {self.date_prevue.strftime('%d/%m/%Y')}"
 
-    @property
-    def duree_reelle(self):
+    def calculer_duree_reelle(self):
         """Calcule la durée réelle de la séance en minutes"""
         if self.date_debut and self.date_fin:
             delta = self.date_fin - self.date_debut
-            return int(delta.total_seconds() / 60)
+            return max(0, int(delta.total_seconds() / 60))
         return None
 
+    @classmethod
+    def est_excellente(cls, nombre_exercices, nombre_excellents):
+        """Une séance est excellente si 80% de ses exercices sont bien notés"""
+        return (
+            nombre_exercices > 0
+            and nombre_excellents / nombre_exercices >= cls.RATIO_SEANCE_EXCELLENTE
+        )
+
     @property
     def est_terminee(self):
         """Vérifie si la séance est terminée"""
@@ -181,29 +339,101 @@ class SeanceEntrainement(TimeStampedModel):
         """Démarre la séance"""
         self.date_debut = timezone.now()
         self.statut = 'EN_COURS'
-        self.save(update_fields=['date_debut', 'statut'])
+        self.save(update_fields=['date_debut', 'duree_reelle', 'statut'])
 
     def terminer_seance(self):
         """Termine la séance et calcule les métriques"""
+        deja_terminee = self.est_terminee
         self.date_fin = timezone.now()
         self.statut = 'TERMINEE'
         self.calculer_metriques()
         self.save()
 
-    def calculer_metriques(self):
-        """Calcule les métriques de la séance"""
-        exercices = self.exercices.all()
+        if not deja_terminee:
+            self.mettre_a_jour_donnees_derivees()
+
+    def mettre_a_jour_donnees_derivees(self):
+        """Répercute une séance terminée sur les données agrégées de l'utilisateur"""
+        # Progressions d'abord : les statistiques en dérivent la progression générale
+        ProgressionMachine.enregistrer_seance(self)
+        StatistiquesUtilisateur.enregistrer_seance(self)
+        AgregatPeriode.enregistrer_seance(self)
+        # Les écritures par lots ci-dessus n'envoient pas de signaux
+        incrementer_version_utilisateur(self.utilisateur_id)
+
+    def save(self, *args, **kwargs):
+        """Override save pour maintenir la durée réelle stockée"""
+        self.duree_reelle = self.calculer_duree_reelle()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'date_debut', 'date_fin'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'duree_reelle'}
+        super().save(*args, **kwargs)
+
+    def calculer_metriques(self, exercices=None):
+        """
+        Calcule les métriques de la séance.
+        Les exercices peuvent être fournis directement (ex: avant leur insertion en base).
+        """
+        if exercices is None:
+            # Totaux calculés en base, en une seule requête
+            totaux = self.exercices.aggregate(
+                nombre=Count('id'),
+                series=Sum('nombre_series'),
+                volume=Sum('volume_total'),
+                tonnage=Sum('tonnage_total')
+            )
+            self.nombre_exercices = totaux['nombre']
+            self.nombre_series_totales = totaux['series'] or 0
+            self.volume_total = totaux['volume'] or 0.0
+            self.tonnage_total = totaux['tonnage'] or 0.0
+            return
 
-        self.nombre_exercices = exercices.count()
+        self.nombre_exercices = len(exercices)
         self.nombre_series_totales = sum(ex.nombre_series for ex in exercices)
         self.volume_total = sum(ex.volume_total for ex in exercices)
         self.tonnage_total = sum(ex.tonnage_total for ex in exercices)
 
 
+class ExerciceSeanceQuerySet(models.QuerySet):
+    """QuerySet des exercices de séance"""
+
+    def recalculer_metriques_series(self):
+        """
+        Recalcule les métriques de tous les exercices du queryset à partir
+        de leurs séries : une requête lit les séries de tous les exercices
+        (par exemple ceux d'une séance) sous forme de colonnes, calculées
+        sans boucle par série (analyses.metriques_par_exercice), une autre
+        enregistre les exercices. Retourne les exercices mis à jour.
+        """
+        from .analyses import metriques_par_exercice
+
+        exercices = list(self)
+        lignes = list(SeriExercice.objects.filter(exercice__in=self.values('pk')).order_by(
+            'exercice_id', 'numero_serie', 'id'
+        ).values_list('exercice_id', 'poids_utilise', 'repetitions_realisees', 'note_effort'))
+        poids_exercices = {exercice.pk: exercice.poids_utilise for exercice in exercices}
+        metriques = metriques_par_exercice(
+            *zip(*lignes), [poids_exercices.get(ligne[0]) for ligne in lignes]
+        ) if lignes else {}
+
+        for exercice in exercices:
+            exercice.calculer_metriques(series=())
+            if exercice.pk in metriques:
+                exercice.appliquer_metriques_series(*metriques[exercice.pk])
+        ExerciceSeance.objects.bulk_update(exercices, ExerciceSeance.CHAMPS_METRIQUES)
+        return exercices
+
+
 class ExerciceSeance(TimeStampedModel):
     """
     Modèle pour un exercice dans une séance
     """
+    # Champs calculés par calculer_metriques()
+    CHAMPS_METRIQUES = [
+        'volume_total', 'tonnage_total', 'charge_maximale_theorique', 'meilleure_serie_poids',
+        'meilleure_serie_repetitions', 'meilleur_1rm_serie', 'effort_moyen'
+    ]
+
     STATUTS_EXERCICE = [
         ('PLANIFIE', 'Planifié'),
         ('EN_COURS', 'En cours'),
@@ -294,6 +524,32 @@ class ExerciceSeance(TimeStampedModel):
         verbose_name="1RM estimé (kg)"
     )
 
+    # Métriques calculées à partir des séries
+    meilleure_serie_poids = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Poids de la série au meilleur 1RM estimé",
+        verbose_name="Meilleure série - poids (kg)"
+    )
+    meilleure_serie_repetitions = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Répétitions de la série au meilleur 1RM estimé",
+        verbose_name="Meilleure série - répétitions"
+    )
+    meilleur_1rm_serie = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Plus haut 1RM estimé (Brzycki) parmi les séries",
+        verbose_name="1RM estimé de la meilleure série (kg)"
+    )
+    effort_moyen = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Moyenne des notes d'effort (RPE) des séries",
+        verbose_name="RPE moyen"
+    )
+
     # Temps et ressenti
     duree_totale = models.PositiveIntegerField(
         null=True,
@@ -312,6 +568,8 @@ class ExerciceSeance(TimeStampedModel):
         verbose_name="Commentaire"
     )
 
+    objects = ExerciceSeanceQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Exercice de séance"
         verbose_name_plural = "Exercices de séances"
@@ -340,8 +598,12 @@ class ExerciceSeance(TimeStampedModel):
             return round(poids * (36 / (37 - repetitions)), 2)
         return None
 
-    def calculer_metriques(self):
-        """Calcule toutes les métriques de l'exercice"""
+    def calculer_metriques(self, series=None):
+        """
+        Calcule toutes les métriques de l'exercice.
+        Les séries peuvent être fournies directement (ex: avant leur insertion
+        en base) ; sinon elles sont lues en base si l'exercice est enregistré.
+        """
         if self.poids_utilise and self.repetitions_realisees:
             self.tonnage_total = self.poids_utilise * self.repetitions_realisees
             self.volume_total = self.tonnage_total * self.nombre_series
@@ -353,6 +615,52 @@ class ExerciceSeance(TimeStampedModel):
                     self.poids_utilise, reps_moyenne
                 )
 
+        if series is None:
+            series = self.series.only(
+                'poids_utilise', 'repetitions_realisees', 'note_effort'
+            ) if self.pk else []
+        self.calculer_metriques_series(series)
+
+    def calculer_metriques_series(self, series):
+        """
+        Métriques issues des séries : tonnage exact (somme des poids × reps
+        de chaque série), meilleure série selon son 1RM estimé et RPE moyen.
+        Sans série réalisée, le tonnage calculé sur l'exercice est conservé.
+        """
+        tonnage = 0.0
+        realisees = False
+        meilleure = None
+        efforts = []
+        for serie in series:
+            if serie.note_effort is not None:
+                efforts.append(serie.note_effort)
+            if not serie.repetitions_realisees:
+                continue
+
+            realisees = True
+            tonnage += (serie.poids_utilise or 0) * serie.repetitions_realisees
+            un_rm = self.calculer_1rm_brzycki(serie.poids_utilise, serie.repetitions_realisees)
+            if un_rm is not None and (meilleure is None or un_rm > meilleure[0]):
+                meilleure = (un_rm, serie.poids_utilise, serie.repetitions_realisees)
+
+        self.appliquer_metriques_series(
+            tonnage if realisees else None,
+            meilleure,
+            round(sum(efforts) / len(efforts), 2) if efforts else None
+        )
+
+    def appliquer_metriques_series(self, tonnage, meilleure, effort_moyen):
+        """
+        Reporte les métriques issues des séries ; un tonnage None (aucune
+        série réalisée) conserve le tonnage calculé sur l'exercice
+        """
+        if tonnage is not None:
+            self.tonnage_total = tonnage
+        self.meilleur_1rm_serie, self.meilleure_serie_poids, self.meilleure_serie_repetitions = (
+            meilleure or (None, None, None)
+        )
+        self.effort_moyen = effort_moyen
+
     def save(self, *args, **kwargs):
         """Override save pour calculer les métriques automatiquement"""
         self.calculer_metriques()
@@ -468,6 +776,12 @@ class ProgressionMachine(TimeStampedModel):
     """
     Modèle pour suivre la progression sur une machine
     """
+    # Champs modifiés par la mise à jour après une séance
+    CHAMPS_MIS_A_JOUR = [
+        'poids_actuel', 'dernier_1rm', 'derniere_seance', 'nombre_seances_machine',
+        'taux_reussite', 'progression_poids_total', 'derniere_progression', 'updated_at'
+    ]
+
     utilisateur = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -560,32 +874,29 @@ class ProgressionMachine(TimeStampedModel):
     def __str__(self):
         return f"{self.utilisateur.nom_complet} - {self.machine.nom} ({self.mode_entrainement})"
 
-    def evaluer_progression(self, exercice_seance):
+    def evaluer_progression(self, exercice_seance, series_reussies=None):
         """
-        Évalue s'il faut progresser en poids basé sur la performance
+        Évalue s'il faut progresser en poids basé sur la performance.
+        Le nombre de séries réussies peut être fourni s'il est déjà connu.
         """
         if not self.increment_automatique:
             return False
 
-        # Calculer le taux de réussite de cette séance
-        series_reussies = 0
-        for serie in exercice_seance.series.all():
-            if serie.est_reussie:
-                series_reussies += 1
-
-        if exercice_seance.nombre_series > 0:
-            taux_reussite_seance = (series_reussies / exercice_seance.nombre_series) * 100
-        else:
+        if exercice_seance.nombre_series <= 0:
             return False
 
-        # Si le taux de réussite dépasse le seuil, on peut progresser
-        if taux_reussite_seance >= self.seuil_progression:
-            return True
+        # Calculer le taux de réussite de cette séance
+        if series_reussies is None:
+            series_reussies = exercice_seance.series.filter(
+                repetitions_realisees__gte=F('repetitions_prevues')
+            ).count()
+        taux_reussite_seance = (series_reussies / exercice_seance.nombre_series) * 100
 
-        return False
+        # Si le taux de réussite dépasse le seuil, on peut progresser
+        return taux_reussite_seance >= self.seuil_progression
 
-    def progresser_poids(self):
-        """Augmente le poids selon l'incrément de la machine"""
+    def _incrementer_poids(self, date=None):
+        """Applique l'incrément de la machine en mémoire, sans sauvegarder"""
         increment = self.machine.increment_poids
         nouveau_poids = self.poids_actuel + increment
 
@@ -593,13 +904,135 @@ class ProgressionMachine(TimeStampedModel):
             ancien_poids = self.poids_actuel
             self.poids_actuel = nouveau_poids
             self.progression_poids_total += increment
-            self.derniere_progression = timezone.now()
-            self.save()
-
+            self.derniere_progression = date or timezone.now()
             return True, ancien_poids, nouveau_poids
 
         return False, self.poids_actuel, self.poids_actuel
 
+    def progresser_poids(self):
+        """Augmente le poids selon l'incrément de la machine"""
+        resultat = self._incrementer_poids()
+        if resultat[0]:
+            self.save()
+        return resultat
+
+    @staticmethod
+    def mode_pour_seance(seance):
+        """
+        Mode d'entraînement auquel rattacher la progression d'une séance :
+        celui de la séance, sinon le mode préféré de l'utilisateur, sinon le
+        mode correspondant à son objectif sportif (None si aucun)
+        """
+        if seance.mode_entrainement_id:
+            return seance.mode_entrainement_id
+        utilisateur = seance.utilisateur
+        if utilisateur.mode_entrainement_prefere_id:
+            return utilisateur.mode_entrainement_prefere_id
+        return ModeEntrainement.objects.filter(
+            nom=utilisateur.objectif_sportif
+        ).values_list('id', flat=True).first()
+
+    @staticmethod
+    def annotations_performance():
+        """Agrégats d'un groupe d'exercices utilisés pour faire progresser une machine"""
+        return {
+            'total_series': Count('series'),
+            'series_reussies': Count(
+                'series',
+                filter=Q(series__repetitions_realisees__gte=F('series__repetitions_prevues'))
+            ),
+            'meilleur_1rm': Max('charge_maximale_theorique'),
+            'poids': Max('poids_utilise'),
+        }
+
+    @classmethod
+    def enregistrer_seance(cls, seance):
+        """
+        Met à jour en une passe les progressions des machines utilisées dans
+        une séance terminée : une requête groupée par machine pour les séries
+        réussies et le 1RM, puis création et mise à jour par lots.
+        """
+        mode_id = cls.mode_pour_seance(seance)
+        if mode_id is None:
+            return []
+
+        performances = {
+            ligne['machine_id']: ligne
+            for ligne in ExerciceSeance.objects.filter(seance=seance).values('machine_id').annotate(
+                **cls.annotations_performance()
+            )
+        }
+        if not performances:
+            return []
+
+        machines = Machine.objects.only(
+            'id', 'increment_poids', 'poids_minimum', 'poids_maximum'
+        ).in_bulk(performances)
+        maintenant = timezone.now()
+
+        with transaction.atomic():
+            progressions = {
+                progression.machine_id: progression
+                for progression in cls.objects.select_for_update().filter(
+                    utilisateur_id=seance.utilisateur_id,
+                    mode_entrainement_id=mode_id,
+                    machine_id__in=performances
+                )
+            }
+            nouvelles = []
+            for machine_id, performance in performances.items():
+                progression = progressions.get(machine_id)
+                if progression is None:
+                    progression = cls(
+                        utilisateur_id=seance.utilisateur_id,
+                        machine_id=machine_id,
+                        mode_entrainement_id=mode_id,
+                        poids_actuel=None
+                    )
+                    nouvelles.append(progression)
+                progression.machine = machines[machine_id]
+                progression.appliquer_performance(seance.id, performance)
+                progression.updated_at = maintenant
+
+            cls.objects.bulk_create(nouvelles)
+            existantes = list(progressions.values())
+            cls.objects.bulk_update(existantes, cls.CHAMPS_MIS_A_JOUR)
+
+        return existantes + nouvelles
+
+    def reinitialiser(self):
+        """Remet à zéro les données issues de l'historique, avant un recalcul complet"""
+        self.poids_actuel = None
+        self.dernier_1rm = None
+        self.derniere_seance = None
+        self.nombre_seances_machine = 0
+        self.progression_poids_total = 0.0
+        self.taux_reussite = 0.0
+        self.derniere_progression = None
+
+    def appliquer_performance(self, seance_id, performance, date=None):
+        """
+        Intègre en mémoire la performance agrégée d'une séance sur la machine
+        (séries, séries réussies, meilleur 1RM, poids). `date` date une
+        éventuelle progression (par défaut : maintenant).
+        """
+        if self.poids_actuel is None:
+            self.poids_actuel = performance['poids'] or self.machine.poids_minimum
+        self.nombre_seances_machine += 1
+        self.derniere_seance_id = seance_id
+        if performance['meilleur_1rm'] is not None:
+            self.dernier_1rm = performance['meilleur_1rm']
+
+        if not performance['total_series']:
+            return
+        taux_seance = performance['series_reussies'] / performance['total_series'] * 100
+        # Taux de réussite moyen sur l'ensemble des séances
+        self.taux_reussite = round(
+            self.taux_reussite + (taux_seance - self.taux_reussite) / self.nombre_seances_machine, 2
+        )
+        if self.increment_automatique and taux_seance >= self.seuil_progression:
+            self._incrementer_poids(date)
+
     def recommander_prochaine_seance(self):
         """
         Recommande les paramètres pour la prochaine séance
@@ -612,4 +1045,405 @@ class ProgressionMachine(TimeStampedModel):
             'series': series,
             'repetitions': repetitions,
             'repos': self.mode_entrainement.repos_entre_series,
-        }
\ No newline at end of file
+        }
+
+
+class StatistiquesUtilisateur(TimeStampedModel):
+    """
+    Statistiques d'entraînement agrégées d'un utilisateur.
+    Mises à jour de façon incrémentale à chaque séance terminée.
+    """
+    CALORIES_PAR_MINUTE = 5
+
+    utilisateur = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistiques_entrainement',
+        verbose_name="Utilisateur"
+    )
+    total_seances = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Séances terminées"
+    )
+    total_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Minutes d'entraînement"
+    )
+    seances_excellentes = models.PositiveIntegerField(
+        default=0,
+        help_text="Séances dont au moins 80% des exercices sont notés 8 ou plus",
+        verbose_name="Séances excellentes"
+    )
+    record_poids = models.FloatField(
+        default=0.0,
+        verbose_name="Record de poids (kg)"
+    )
+    compteur_machines = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Nombre d'exercices réalisés par machine",
+        verbose_name="Compteur par machine"
+    )
+    exercices_favoris = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Exercices favoris"
+    )
+    progression_generale = models.FloatField(
+        default=0.0,
+        help_text="Moyenne des progressions de poids sur les machines",
+        verbose_name="Progression générale (kg)"
+    )
+
+    class Meta:
+        verbose_name = "Statistiques utilisateur"
+        verbose_name_plural = "Statistiques utilisateurs"
+
+    def __str__(self):
+        return f"Statistiques de {self.utilisateur.nom_complet}"
+
+    @property
+    def total_calories(self):
+        """Estimation approximative des calories dépensées (5 cal/min)"""
+        return self.total_minutes * self.CALORIES_PAR_MINUTE
+
+    @classmethod
+    def pour_utilisateur(cls, utilisateur):
+        """
+        Retourne les statistiques de l'utilisateur, en les construisant
+        depuis l'historique lors du premier accès
+        """
+        stats, created = cls.objects.get_or_create(utilisateur=utilisateur)
+        if created:
+            stats.recalculer()
+        return stats
+
+    @classmethod
+    def enregistrer_seance(cls, seance):
+        """Ajoute une séance terminée aux statistiques de son utilisateur"""
+        with transaction.atomic():
+            stats, created = cls.objects.select_for_update().get_or_create(
+                utilisateur_id=seance.utilisateur_id
+            )
+            if created:
+                # La reconstruction depuis l'historique inclut déjà cette séance
+                stats.recalculer()
+                return stats
+
+            par_machine = stats._agreger_par_machine(seance.exercices.all())
+            nombre_exercices = sum(ligne['nombre'] for ligne in par_machine)
+            nombre_excellents = sum(ligne['excellents'] for ligne in par_machine)
+
+            stats.total_seances += 1
+            stats.total_minutes += seance.duree_reelle or 0
+            if SeanceEntrainement.est_excellente(nombre_exercices, nombre_excellents):
+                stats.seances_excellentes += 1
+
+            for ligne in par_machine:
+                nom = ligne['machine__nom']
+                stats.compteur_machines[nom] = stats.compteur_machines.get(nom, 0) + ligne['nombre']
+                if ligne['poids_max'] is not None:
+                    stats.record_poids = max(stats.record_poids, ligne['poids_max'])
+
+            stats.exercices_favoris = stats._calculer_favoris()
+            stats.progression_generale = stats._calculer_progression_generale()
+            stats.save()
+        return stats
+
+    @classmethod
+    def recalculer_utilisateur(cls, utilisateur_id):
+        """
+        Reconstruit les statistiques d'un utilisateur après la modification
+        ou la suppression d'une séance terminée (sans ligne, rien à faire :
+        elle sera construite au premier accès)
+        """
+        stats = cls.objects.filter(utilisateur_id=utilisateur_id).first()
+        if stats is not None:
+            stats.recalculer()
+        return stats
+
+    def recalculer(self):
+        """Reconstruit entièrement les statistiques depuis l'historique"""
+        seances = SeanceEntrainement.objects.filter(
+            utilisateur_id=self.utilisateur_id,
+            statut='TERMINEE'
+        )
+        exercices = ExerciceSeance.objects.filter(seance__in=seances)
+
+        totaux = seances.aggregate(nombre=Count('id'), minutes=Sum('duree_reelle'))
+        self.total_seances = totaux['nombre']
+        self.total_minutes = totaux['minutes'] or 0
+        self.seances_excellentes = seances.nombre_excellentes()
+
+        par_machine = self._agreger_par_machine(exercices)
+        self.compteur_machines = {
+            ligne['machine__nom']: ligne['nombre'] for ligne in par_machine
+        }
+        self.record_poids = max(
+            (ligne['poids_max'] for ligne in par_machine if ligne['poids_max'] is not None),
+            default=0.0
+        )
+        self.exercices_favoris = self._calculer_favoris()
+        self.progression_generale = self._calculer_progression_generale()
+        self.save()
+
+    def _agreger_par_machine(self, exercices):
+        """Nombre d'exercices, exercices excellents et poids max par machine"""
+        return list(
+            exercices.values('machine__nom').annotate(
+                nombre=Count('id'),
+                excellents=Count(
+                    'id',
+                    filter=Q(note_ressenti__gte=SeanceEntrainement.SEUIL_NOTE_EXCELLENTE)
+                ),
+                poids_max=Max('poids_utilise')
+            ).order_by()
+        )
+
+    def _calculer_favoris(self):
+        """Top 3 des machines les plus utilisées"""
+        classement = sorted(
+            self.compteur_machines.items(), key=lambda item: item[1], reverse=True
+        )
+        return [nom for nom, _ in classement[:3]]
+
+    def _calculer_progression_generale(self):
+        """Moyenne des progressions de poids sur l'ensemble des machines"""
+        return ProgressionMachine.objects.filter(
+            utilisateur_id=self.utilisateur_id
+        ).aggregate(Avg('progression_poids_total'))['progression_poids_total__avg'] or 0.0
+
+
+class AgregatBase(models.Model):
+    """
+    Cumuls d'entraînement d'un utilisateur sur une période (semaine ou mois).
+    Les lignes sont alimentées à chaque séance terminée ; la commande
+    recalculer_agregats les reconstruit depuis l'historique.
+    """
+    SEMAINE = 'SEMAINE'
+    MOIS = 'MOIS'
+    PERIODES = [
+        (SEMAINE, 'Semaine'),
+        (MOIS, 'Mois'),
+    ]
+
+    # Champs identifiant une ligne en plus de l'utilisateur, et champs cumulés
+    CLE = ('periode', 'debut_periode')
+    CHAMPS_CUMULES = ('exercices', 'series', 'volume', 'tonnage')
+
+    utilisateur = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Utilisateur"
+    )
+    periode = models.CharField(
+        max_length=10,
+        choices=PERIODES,
+        verbose_name="Période"
+    )
+    debut_periode = models.DateField(
+        help_text="Lundi de la semaine ou premier jour du mois",
+        verbose_name="Début de période"
+    )
+    exercices = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Exercices"
+    )
+    series = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Séries"
+    )
+    volume = models.PositiveIntegerField(
+        default=0,
+        help_text="Répétitions réalisées",
+        verbose_name="Volume (répétitions)"
+    )
+    tonnage = models.FloatField(
+        default=0.0,
+        verbose_name="Tonnage (kg)"
+    )
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def debuts_periodes(cls, jour):
+        """Début de la semaine et du mois contenant un jour"""
+        return {
+            cls.SEMAINE: jour - timedelta(days=jour.weekday()),
+            cls.MOIS: jour.replace(day=1),
+        }
+
+    @staticmethod
+    def annotations_exercices():
+        """
+        Cumuls d'un groupe d'exercices, dans l'ordre de CHAMPS_CUMULES.
+        Le volume est la somme des répétitions des séries réalisées ; un
+        exercice sans série réalisée compte nombre_series × répétitions,
+        comme pour son tonnage.
+        """
+        repetitions_series = SeriExercice.objects.filter(
+            exercice=OuterRef('pk'), repetitions_realisees__gt=0
+        ).values('exercice').annotate(total=Sum('repetitions_realisees')).values('total')
+        return {
+            'exercices': Count('id'),
+            'series': Sum('nombre_series'),
+            'volume': Sum(Coalesce(
+                Subquery(repetitions_series, output_field=IntegerField()),
+                F('nombre_series') * F('repetitions_realisees')
+            )),
+            'tonnage': Sum('tonnage_total'),
+        }
+
+    @classmethod
+    def cumuler(cls, utilisateur_id, increments):
+        """
+        Ajoute des increments aux lignes d'un utilisateur.
+        `increments` associe une clé (valeurs de CLE) à un dict champ -> valeur.
+        Les lignes existantes sont verrouillées puis mises à jour par lot, les
+        autres créées par lot.
+        """
+        if not increments:
+            return
+
+        existantes = {
+            tuple(getattr(ligne, champ) for champ in cls.CLE): ligne
+            for ligne in cls.objects.select_for_update().filter(
+                utilisateur_id=utilisateur_id,
+                debut_periode__in={cle[1] for cle in increments}
+            )
+        }
+        nouvelles = []
+        for cle, valeurs in increments.items():
+            ligne = existantes.get(cle)
+            if ligne is None:
+                ligne = cls(utilisateur_id=utilisateur_id, **dict(zip(cls.CLE, cle)))
+                nouvelles.append(ligne)
+            for champ, valeur in valeurs.items():
+                setattr(ligne, champ, getattr(ligne, champ) + (valeur or 0))
+
+        cls.objects.bulk_update(
+            [existantes[cle] for cle in increments if cle in existantes], cls.CHAMPS_CUMULES
+        )
+        cls.objects.bulk_create(nouvelles)
+
+
+class AgregatPeriode(AgregatBase):
+    """Séances, minutes et charges d'un utilisateur par semaine et par mois"""
+    CHAMPS_CUMULES = AgregatBase.CHAMPS_CUMULES + ('seances', 'minutes')
+
+    seances = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Séances terminées"
+    )
+    minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Minutes d'entraînement"
+    )
+
+    class Meta:
+        verbose_name = "Agrégat par période"
+        verbose_name_plural = "Agrégats par période"
+        unique_together = ['utilisateur', 'periode', 'debut_periode']
+        ordering = ['utilisateur', 'periode', '-debut_periode']
+
+    def __str__(self):
+        return f"{self.utilisateur_id} - {self.get_periode_display()} du {self.debut_periode}"
+
+    @classmethod
+    def seances_periode_courante(cls, utilisateur, periode=AgregatBase.SEMAINE):
+        """Nombre de séances terminées pendant la semaine (ou le mois) en cours"""
+        debut = cls.debuts_periodes(timezone.localdate())[periode]
+        return cls.objects.filter(
+            utilisateur=utilisateur, periode=periode, debut_periode=debut
+        ).values_list('seances', flat=True).first() or 0
+
+    @classmethod
+    def enregistrer_seance(cls, seance):
+        """
+        Ajoute une séance terminée aux agrégats de sa semaine et de son mois,
+        globaux, par machine et par groupe musculaire
+        """
+        date = seance.date_debut or seance.date_prevue
+        if date is None:
+            return
+        debuts = cls.debuts_periodes(timezone.localtime(date).date())
+
+        par_machine = {}
+        for ligne in seance.exercices.values('machine_id').annotate(
+            **cls.annotations_exercices()
+        ).order_by():
+            par_machine[ligne.pop('machine_id')] = ligne
+        totaux = {champ: 0 for champ in AgregatBase.CHAMPS_CUMULES}
+        for ligne in par_machine.values():
+            for champ in totaux:
+                totaux[champ] += ligne[champ] or 0
+
+        par_groupe = {}
+        liens = Machine.groupes_musculaires_primaires.through.objects.filter(
+            machine_id__in=par_machine
+        ).values_list('machine_id', 'groupemusculaire_id')
+        for machine_id, groupe_id in liens:
+            cumul = par_groupe.setdefault(groupe_id, {champ: 0 for champ in AgregatBase.CHAMPS_CUMULES})
+            for champ in cumul:
+                cumul[champ] += par_machine[machine_id][champ] or 0
+
+        with transaction.atomic():
+            cls.cumuler(seance.utilisateur_id, {
+                (periode, debut): {**totaux, 'seances': 1, 'minutes': seance.duree_reelle or 0}
+                for periode, debut in debuts.items()
+            })
+            AgregatMachine.cumuler(seance.utilisateur_id, {
+                (periode, debut, machine_id): valeurs
+                for periode, debut in debuts.items()
+                for machine_id, valeurs in par_machine.items()
+            })
+            AgregatGroupeMusculaire.cumuler(seance.utilisateur_id, {
+                (periode, debut, groupe_id): valeurs
+                for periode, debut in debuts.items()
+                for groupe_id, valeurs in par_groupe.items()
+            })
+
+
+class AgregatMachine(AgregatBase):
+    """Charges d'un utilisateur sur une machine par semaine et par mois"""
+    CLE = AgregatBase.CLE + ('machine_id',)
+
+    machine = models.ForeignKey(
+        Machine,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Machine"
+    )
+
+    class Meta:
+        verbose_name = "Agrégat par machine"
+        verbose_name_plural = "Agrégats par machine"
+        unique_together = ['utilisateur', 'periode', 'debut_periode', 'machine']
+        ordering = ['utilisateur', 'periode', '-debut_periode', 'machine']
+
+    def __str__(self):
+        return f"{self.utilisateur_id} - machine {self.machine_id} - {self.debut_periode}"
+
+
+class AgregatGroupeMusculaire(AgregatBase):
+    """Charges d'un utilisateur par groupe musculaire primaire, par semaine et par mois"""
+    CLE = AgregatBase.CLE + ('groupe_musculaire_id',)
+
+    groupe_musculaire = models.ForeignKey(
+        GroupeMusculaire,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Groupe musculaire"
+    )
+
+    class Meta:
+        verbose_name = "Agrégat par groupe musculaire"
+        verbose_name_plural = "Agrégats par groupe musculaire"
+        unique_together = ['utilisateur', 'periode', 'debut_periode', 'groupe_musculaire']
+        ordering = ['utilisateur', 'periode', '-debut_periode', 'groupe_musculaire']
+
+    def __str__(self):
+        return f"{self.utilisateur_id} - groupe {self.groupe_musculaire_id} - {self.debut_periode}"
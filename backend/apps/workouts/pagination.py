@@ -0,0 +1,63 @@
+"""
+Pagination par curseur de l'historique des séances.
+
+Les séances sont parcourues des plus récentes aux plus anciennes selon
+(date_debut, id), les séances sans date de début venant en dernier. Le
+curseur désigne la dernière séance renvoyée : chaque page est une simple
+lecture d'index, quelle que soit la profondeur dans l'historique.
+"""
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+
+ORDRE_HISTORIQUE = (F('date_debut').desc(nulls_last=True), F('id').desc())
+
+
+def encoder_curseur(date_debut, seance_id):
+    """Curseur opaque désignant une séance de l'historique"""
+    date_debut = date_debut.isoformat() if date_debut else None
+    return urlsafe_base64_encode(json.dumps([date_debut, seance_id]).encode())
+
+
+def decoder_curseur(curseur):
+    """Retourne le couple (date_debut, id) encodé dans le curseur"""
+    try:
+        date_debut, seance_id = json.loads(urlsafe_base64_decode(curseur))
+        if date_debut is not None:
+            date_debut = parse_datetime(date_debut)
+            if date_debut is None:
+                raise ValueError
+        return date_debut, int(seance_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Curseur invalide")
+
+
+def page_historique(seances, curseur, nombre):
+    """
+    Retourne au plus `nombre` séances situées après le curseur (ou depuis le
+    début sans curseur), dans l'ordre de l'historique. Les séances datées et
+    la queue des séances sans date de début sont lues par deux requêtes
+    distinctes, chacune servie par un parcours de l'index (utilisateur,
+    date_debut DESC NULLS LAST, id DESC) ; la seconde n'est exécutée que si
+    la première ne remplit pas la page. Lève ValueError si le curseur est invalide.
+    """
+    date_debut, seance_id = decoder_curseur(curseur) if curseur else (None, None)
+
+    page = []
+    sans_date = seances.filter(date_debut__isnull=True)
+    if curseur is None or date_debut is not None:
+        datees = seances.filter(date_debut__isnull=False)
+        if date_debut is not None:
+            datees = datees.filter(
+                Q(date_debut__lt=date_debut) | Q(date_debut=date_debut, id__lt=seance_id),
+                date_debut__lte=date_debut
+            )
+        page = list(datees.order_by(*ORDRE_HISTORIQUE)[:nombre])
+    else:
+        sans_date = sans_date.filter(id__lt=seance_id)
+
+    if len(page) < nombre:
+        page += list(sans_date.order_by(*ORDRE_HISTORIQUE)[:nombre - len(page)])
+    return page
@@ -0,0 +1,235 @@
+"""
+Reconstructions complètes depuis l'historique : progressions sur machines
+et agrégats par période
+"""
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, FloatField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from apps.core.cache_utilisateur import incrementer_version_utilisateur
+from apps.core.models import ModeEntrainement
+from apps.machines.models import Machine
+from apps.users.models import User
+from .models import (
+    SeanceEntrainement, ExerciceSeance, ProgressionMachine, StatistiquesUtilisateur,
+    AgregatBase, AgregatPeriode, AgregatMachine, AgregatGroupeMusculaire
+)
+
+
+def recalculer_progressions(utilisateur_ids, taille_lot=2000):
+    """
+    Rejoue toutes les séances terminées des utilisateurs donnés, machine par
+    machine et dans l'ordre chronologique, puis écrit les progressions par lots.
+    Les performances sont lues en flux (une ligne par séance et par machine) :
+    seules les progressions des utilisateurs traités restent en mémoire.
+    Retourne (performances rejouées, séries lues, progressions écrites).
+    """
+    modes_par_nom = dict(ModeEntrainement.objects.values_list('nom', 'id'))
+    mode_par_defaut = {
+        utilisateur['id']: (
+            utilisateur['mode_entrainement_prefere_id']
+            or modes_par_nom.get(utilisateur['objectif_sportif'])
+        )
+        for utilisateur in User.objects.filter(id__in=utilisateur_ids).values(
+            'id', 'mode_entrainement_prefere_id', 'objectif_sportif'
+        )
+    }
+    machines = Machine.objects.only(
+        'id', 'increment_poids', 'poids_minimum', 'poids_maximum'
+    ).in_bulk()
+
+    performances = ExerciceSeance.objects.filter(
+        seance__utilisateur_id__in=utilisateur_ids,
+        seance__statut='TERMINEE'
+    ).values(
+        'seance__utilisateur_id', 'machine_id', 'seance_id',
+        'seance__mode_entrainement_id', 'seance__date_debut'
+    ).annotate(
+        **ProgressionMachine.annotations_performance()
+    ).order_by(
+        'seance__utilisateur_id', 'machine_id', 'seance__date_debut', 'seance_id'
+    )
+
+    with transaction.atomic():
+        existantes = {}
+        for progression in ProgressionMachine.objects.select_for_update().filter(
+            utilisateur_id__in=utilisateur_ids
+        ):
+            cle = (progression.utilisateur_id, progression.machine_id, progression.mode_entrainement_id)
+            progression.reinitialiser()
+            progression.machine = machines[progression.machine_id]
+            existantes[cle] = progression
+
+        nouvelles = {}
+        nombre_performances = nombre_series = 0
+        for performance in performances.iterator(chunk_size=taille_lot):
+            utilisateur_id = performance['seance__utilisateur_id']
+            mode_id = performance['seance__mode_entrainement_id'] or mode_par_defaut.get(utilisateur_id)
+            if mode_id is None:
+                continue
+
+            cle = (utilisateur_id, performance['machine_id'], mode_id)
+            progression = existantes.get(cle) or nouvelles.get(cle)
+            if progression is None:
+                progression = nouvelles[cle] = ProgressionMachine(
+                    utilisateur_id=utilisateur_id,
+                    machine_id=performance['machine_id'],
+                    mode_entrainement_id=mode_id,
+                    poids_actuel=None
+                )
+                progression.machine = machines[performance['machine_id']]
+
+            progression.appliquer_performance(
+                performance['seance_id'], performance, date=performance['seance__date_debut']
+            )
+            nombre_performances += 1
+            nombre_series += performance['total_series']
+
+        # Plus aucune séance terminée sur la machine (séance supprimée ou
+        # rouverte) : la progression disparaît, la prochaine séance la recrée
+        orphelines = [
+            progression.pk for progression in existantes.values() if progression.poids_actuel is None
+        ]
+        existantes = {
+            cle: progression for cle, progression in existantes.items()
+            if progression.poids_actuel is not None
+        }
+        maintenant = timezone.now()
+        for progression in existantes.values():
+            progression.updated_at = maintenant
+
+        ProgressionMachine.objects.filter(pk__in=orphelines).delete()
+        ProgressionMachine.objects.bulk_update(
+            existantes.values(), ProgressionMachine.CHAMPS_MIS_A_JOUR, batch_size=taille_lot
+        )
+        ProgressionMachine.objects.bulk_create(nouvelles.values(), batch_size=taille_lot)
+
+        for utilisateur_id in utilisateur_ids:
+            incrementer_version_utilisateur(utilisateur_id)
+
+    return nombre_performances, nombre_series, len(existantes) + len(nouvelles)
+
+
+# Troncature SQL correspondant à chaque type de période
+TRONCATURES = {
+    AgregatBase.SEMAINE: 'week',
+    AgregatBase.MOIS: 'month',
+}
+
+
+def _inserer_par_lots(modele, objets, taille_lot):
+    """Insère un flux d'objets par lots de taille_lot ; retourne le nombre inséré"""
+    nombre = 0
+    while True:
+        lot = list(islice(objets, taille_lot))
+        if not lot:
+            return nombre
+        modele.objects.bulk_create(lot)
+        nombre += len(lot)
+
+
+def recalculer_agregats(utilisateur_ids=None, taille_lot=2000):
+    """
+    Reconstruit les agrégats par période (globaux, par machine et par groupe
+    musculaire) depuis les séances terminées, tous utilisateurs ou seulement
+    ceux donnés. Les cumuls sont calculés en base par requêtes groupées et
+    lus en flux. Retourne le nombre de lignes créées.
+    """
+    seances = SeanceEntrainement.objects.filter(statut='TERMINEE')
+    modeles = (AgregatPeriode, AgregatMachine, AgregatGroupeMusculaire)
+    if utilisateur_ids is not None:
+        seances = seances.filter(utilisateur_id__in=utilisateur_ids)
+    exercices = ExerciceSeance.objects.filter(seance__in=seances)
+    annotations = {
+        champ: Coalesce(agregat, 0, output_field=FloatField() if champ == 'tonnage' else IntegerField())
+        for champ, agregat in AgregatBase.annotations_exercices().items()
+    }
+
+    nombre = 0
+    with transaction.atomic():
+        for modele in modeles:
+            lignes = modele.objects.all()
+            if utilisateur_ids is not None:
+                lignes = lignes.filter(utilisateur_id__in=utilisateur_ids)
+            lignes.delete()
+
+        for periode, troncature in TRONCATURES.items():
+            debut_seance = Trunc(
+                Coalesce('date_debut', 'date_prevue'), troncature, output_field=DateField()
+            )
+            debut_exercice = Trunc(
+                Coalesce('seance__date_debut', 'seance__date_prevue'), troncature, output_field=DateField()
+            )
+
+            nombre += _inserer_par_lots(AgregatMachine, (
+                AgregatMachine(
+                    utilisateur_id=ligne.pop('seance__utilisateur_id'), periode=periode, **ligne
+                )
+                for ligne in exercices.annotate(debut_periode=debut_exercice).values(
+                    'seance__utilisateur_id', 'debut_periode', 'machine_id'
+                ).annotate(**annotations).order_by().iterator(chunk_size=taille_lot)
+            ), taille_lot)
+
+            nombre += _inserer_par_lots(AgregatGroupeMusculaire, (
+                AgregatGroupeMusculaire(
+                    utilisateur_id=ligne.pop('seance__utilisateur_id'), periode=periode, **ligne
+                )
+                for ligne in exercices.filter(
+                    machine__groupes_musculaires_primaires__isnull=False
+                ).annotate(
+                    debut_periode=debut_exercice,
+                    groupe_musculaire_id=F('machine__groupes_musculaires_primaires')
+                ).values(
+                    'seance__utilisateur_id', 'debut_periode', 'groupe_musculaire_id'
+                ).annotate(**annotations).order_by().iterator(chunk_size=taille_lot)
+            ), taille_lot)
+
+            nombre += _inserer_par_lots(AgregatPeriode, (
+                AgregatPeriode(periode=periode, **ligne)
+                for ligne in seances.annotate(debut_periode=debut_seance).values(
+                    'utilisateur_id', 'debut_periode'
+                ).annotate(
+                    seances=Count('id'), minutes=Coalesce(Sum('duree_reelle'), 0)
+                ).order_by().iterator(chunk_size=taille_lot)
+            ), taille_lot)
+
+        # Les totaux par période sont la somme des agrégats par machine
+        par_machine = AgregatMachine.objects.filter(
+            utilisateur_id=OuterRef('utilisateur_id'),
+            periode=OuterRef('periode'),
+            debut_periode=OuterRef('debut_periode')
+        ).values('utilisateur_id').order_by()
+        periodes = AgregatPeriode.objects.all()
+        if utilisateur_ids is not None:
+            periodes = periodes.filter(utilisateur_id__in=utilisateur_ids)
+        periodes.update(**{
+            champ: Coalesce(
+                Subquery(par_machine.annotate(total=Sum(champ)).values('total')),
+                0,
+                output_field=FloatField() if champ == 'tonnage' else IntegerField()
+            )
+            for champ in AgregatBase.CHAMPS_CUMULES
+        })
+
+        if utilisateur_ids is None:
+            utilisateur_ids = User.objects.values_list('id', flat=True).iterator()
+        for utilisateur_id in utilisateur_ids:
+            incrementer_version_utilisateur(utilisateur_id)
+
+    return nombre
+
+
+def recalculer_utilisateur(utilisateur_id):
+    """
+    Reconstruit les progressions, les statistiques et les agrégats d'un
+    utilisateur après la modification, la sortie du statut TERMINEE ou la
+    suppression d'une séance terminée : sa contribution, ajoutée par
+    incréments, ne peut pas être retirée autrement
+    """
+    with transaction.atomic():
+        recalculer_progressions([utilisateur_id])
+        StatistiquesUtilisateur.recalculer_utilisateur(utilisateur_id)
+        recalculer_agregats([utilisateur_id])
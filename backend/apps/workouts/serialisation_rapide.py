@@ -0,0 +1,173 @@
+"""
+Sérialisation rapide, en lecture seule, des séances complètes.
+
+Produit exactement la même représentation que SeanceEntrainementSerializer
+(exercices, machines, variantes et séries développés), mais à partir de
+lignes values() et d'accesseurs précalculés : ni instances de modèles, ni
+parcours champ par champ des serializers DRF à chaque objet.
+
+Les plans de sérialisation sont déduits des serializers eux-mêmes, ce qui
+garantit que les deux chemins restent alignés.
+"""
+from functools import lru_cache
+
+from rest_framework import serializers
+
+from apps.core.models import ModeEntrainement
+from apps.machines.models import Machine, VarianteMachine
+from .models import ExerciceSeance, SeriExercice
+from .serializers import (
+    SeanceEntrainementSerializer, ExerciceSeanceSerializer, SeriExerciceSerializer,
+    MachineSerializer, VarianteMachineSerializer, ModeEntrainementSerializer
+)
+
+
+def _conversion(champ):
+    """Conversion appliquée à une valeur non nulle (None : valeur inchangée)"""
+    if isinstance(champ, (serializers.ChoiceField, serializers.ReadOnlyField)):
+        return None
+    if isinstance(champ, serializers.IntegerField):
+        return int
+    if isinstance(champ, serializers.FloatField):
+        return float
+    if isinstance(champ, serializers.CharField):
+        return str
+    return champ.to_representation
+
+
+class PlanSerialisation:
+    """
+    Liste précalculée (nom, colonne, conversion) des champs d'un serializer.
+    Les champs listés dans `relations` sont fournis par l'appelant.
+    """
+
+    def __init__(self, serializer_class, relations=()):
+        self.champs = []
+        for nom, champ in serializer_class().fields.items():
+            if champ.write_only:
+                continue
+            if nom in relations:
+                self.champs.append((nom, None, None))
+            else:
+                self.champs.append((nom, champ.source, _conversion(champ)))
+        self.colonnes = [colonne for _, colonne, _ in self.champs if colonne]
+
+    def serialiser(self, ligne, relations=None):
+        resultat = {}
+        for nom, colonne, conversion in self.champs:
+            if colonne is None:
+                resultat[nom] = relations[nom]
+                continue
+            valeur = ligne[colonne]
+            if valeur is not None and conversion is not None:
+                valeur = conversion(valeur)
+            resultat[nom] = valeur
+        return resultat
+
+
+@lru_cache(maxsize=None)
+def _plans():
+    return {
+        'seance': PlanSerialisation(
+            SeanceEntrainementSerializer, relations=('mode_entrainement', 'exercices')
+        ),
+        'mode': PlanSerialisation(ModeEntrainementSerializer),
+        'exercice': PlanSerialisation(
+            ExerciceSeanceSerializer, relations=('machine', 'variante', 'series')
+        ),
+        'machine': PlanSerialisation(MachineSerializer, relations=('groupe_musculaire',)),
+        'variante': PlanSerialisation(VarianteMachineSerializer),
+        'serie': PlanSerialisation(SeriExerciceSerializer),
+    }
+
+
+def _par_id(queryset, plan, ids):
+    """Sérialise les objets d'un modèle simple, indexés par id"""
+    if not ids:
+        return {}
+    return {
+        ligne['id']: plan.serialiser(ligne)
+        for ligne in queryset.filter(id__in=ids).values(*plan.colonnes)
+    }
+
+
+def _machines(ids):
+    """Machines sérialisées, avec leur premier groupe musculaire primaire"""
+    if not ids:
+        return {}
+    plan = _plans()['machine']
+
+    groupes = {}
+    liens = Machine.groupes_musculaires_primaires.through.objects.filter(
+        machine_id__in=ids
+    ).order_by(
+        'machine_id', 'groupemusculaire__ordre_affichage', 'groupemusculaire__nom'
+    ).values_list('machine_id', 'groupemusculaire__nom')
+    for machine_id, nom in liens:
+        groupes.setdefault(machine_id, nom)
+
+    return {
+        ligne['id']: plan.serialiser(ligne, {'groupe_musculaire': groupes.get(ligne['id'], '')})
+        for ligne in Machine.objects.filter(id__in=ids).values(*plan.colonnes)
+    }
+
+
+def _exercices(seance_ids):
+    """Exercices sérialisés, regroupés par séance dans l'ordre de la séance"""
+    plans = _plans()
+
+    lignes = list(
+        ExerciceSeance.objects.filter(seance_id__in=seance_ids)
+        .order_by('seance_id', 'ordre_dans_seance')
+        .values(*plans['exercice'].colonnes, 'seance_id', 'machine_id', 'variante_id')
+    )
+
+    series = {}
+    for ligne in (
+        SeriExercice.objects.filter(exercice__seance_id__in=seance_ids)
+        .order_by('exercice_id', 'numero_serie')
+        .values(*plans['serie'].colonnes, 'exercice_id')
+    ):
+        series.setdefault(ligne['exercice_id'], []).append(plans['serie'].serialiser(ligne))
+
+    machines = _machines({ligne['machine_id'] for ligne in lignes})
+    variantes = _par_id(
+        VarianteMachine.objects.all(), plans['variante'],
+        {ligne['variante_id'] for ligne in lignes if ligne['variante_id']}
+    )
+
+    exercices = {}
+    for ligne in lignes:
+        exercices.setdefault(ligne['seance_id'], []).append(
+            plans['exercice'].serialiser(ligne, {
+                'machine': machines[ligne['machine_id']],
+                'variante': variantes.get(ligne['variante_id']),
+                'series': series.get(ligne['id'], []),
+            })
+        )
+    return exercices
+
+
+def serialiser_seances(seances):
+    """
+    Sérialise un queryset de séances, dans son ordre, sous la même forme
+    que SeanceEntrainementSerializer(seances, many=True).data
+    """
+    plans = _plans()
+    lignes = list(seances.values(*plans['seance'].colonnes, 'mode_entrainement_id'))
+    if not lignes:
+        return []
+
+    modes = _par_id(
+        ModeEntrainement.objects.all(), plans['mode'],
+        {ligne['mode_entrainement_id'] for ligne in lignes if ligne['mode_entrainement_id']}
+    )
+    exercices = _exercices([ligne['id'] for ligne in lignes])
+
+    return [
+        plans['seance'].serialiser(ligne, {
+            'mode_entrainement': modes.get(ligne['mode_entrainement_id']),
+            'exercices': exercices.get(ligne['id'], []),
+        })
+        for ligne in lignes
+    ]
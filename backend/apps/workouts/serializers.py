@@ -1,18 +1,85 @@
 """
 Serializers pour l'API des entraînements
 """
+from django.db import transaction
 from rest_framework import serializers
 from .models import SeanceEntrainement, ExerciceSeance, SeriExercice, ProgressionMachine
 from apps.machines.models import Machine, VarianteMachine
 from apps.core.models import ModeEntrainement
 
 
+EXPANSIONS_SEANCE = frozenset({'exercices', 'series', 'machine'})
+
+
+def options_affichage(query_params):
+    """
+    Lit les paramètres ?fields= et ?expand= d'une requête.
+    Retourne (champs, expand) ; chacun vaut None si le paramètre est absent.
+    """
+    def lire(nom):
+        valeur = query_params.get(nom)
+        if valeur is None:
+            return None
+        return frozenset(element.strip() for element in valeur.split(',') if element.strip())
+
+    expand = lire('expand')
+    if expand is not None:
+        expand &= EXPANSIONS_SEANCE
+    return lire('fields'), expand
+
+
+class ChampsDynamiquesMixin:
+    """
+    Adapte les champs d'un serializer au contexte :
+    - 'champs' : champs de premier niveau à conserver (?fields=)
+    - 'expand' : relations imbriquées à développer (?expand=) ; sans ce
+      paramètre, toutes les relations sont développées.
+    EXPANSIONS associe un nom d'expansion au champ imbriqué concerné et à
+    la représentation utilisée lorsqu'il n'est pas développé (None : retiré).
+    """
+    EXPANSIONS = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        expand = self.context.get('expand')
+        if expand is not None:
+            for nom_expansion, (nom_champ, repli) in self.EXPANSIONS.items():
+                if nom_expansion in expand:
+                    continue
+                if repli is None:
+                    fields.pop(nom_champ, None)
+                else:
+                    fields[nom_champ] = repli()
+
+        champs = self.context.get('champs')
+        if champs and self._est_racine():
+            fields = {nom: champ for nom, champ in fields.items() if nom in champs}
+
+        return fields
+
+    def _est_racine(self):
+        """Vrai pour le serializer de premier niveau (éventuellement dans une liste)"""
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
 class MachineSerializer(serializers.ModelSerializer):
     """Serializer pour les machines"""
+    nom_technique = serializers.CharField(source='nom_anglais', read_only=True)
+    groupe_musculaire = serializers.SerializerMethodField()
+
     class Meta:
         model = Machine
         fields = ['id', 'nom', 'nom_technique', 'groupe_musculaire', 'description']
 
+    def get_groupe_musculaire(self, obj):
+        """Premier groupe musculaire primaire de la machine"""
+        groupes = obj.groupes_musculaires_primaires.all()
+        return groupes[0].nom if groupes else ''
+
 
 class VarianteMachineSerializer(serializers.ModelSerializer):
     """Serializer pour les variantes de machines"""
@@ -28,7 +95,7 @@ class ModeEntrainementSerializer(serializers.ModelSerializer):
         fields = ['id', 'nom', 'description']
 
 
-class SeriExerciceSerializer(serializers.ModelSerializer):
+class SeriExerciceSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
     """Serializer pour les séries d'exercices"""
     class Meta:
         model = SeriExercice
@@ -39,8 +106,13 @@ class SeriExerciceSerializer(serializers.ModelSerializer):
         ]
 
 
-class ExerciceSeanceSerializer(serializers.ModelSerializer):
+class ExerciceSeanceSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
     """Serializer pour les exercices de séance"""
+    EXPANSIONS = {
+        'machine': ('machine', lambda: serializers.PrimaryKeyRelatedField(read_only=True)),
+        'series': ('series', None),
+    }
+
     machine = MachineSerializer(read_only=True)
     machine_id = serializers.IntegerField(write_only=True)
     variante = VarianteMachineSerializer(read_only=True)
@@ -54,13 +126,18 @@ class ExerciceSeanceSerializer(serializers.ModelSerializer):
             'ordre_dans_seance', 'series_prevues', 'repetitions_prevues',
             'poids_prevu', 'repos_prevu', 'statut', 'nombre_series',
             'repetitions_realisees', 'poids_utilise', 'volume_total',
-            'tonnage_total', 'duree_totale', 'note_ressenti',
+            'tonnage_total', 'meilleure_serie_poids', 'meilleure_serie_repetitions',
+            'meilleur_1rm_serie', 'effort_moyen', 'duree_totale', 'note_ressenti',
             'commentaire', 'series'
         ]
 
 
-class SeanceEntrainementSerializer(serializers.ModelSerializer):
+class SeanceEntrainementSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
     """Serializer pour les séances d'entraînement"""
+    EXPANSIONS = {
+        'exercices': ('exercices', None),
+    }
+
     mode_entrainement = ModeEntrainementSerializer(read_only=True)
     mode_entrainement_id = serializers.IntegerField(write_only=True, required=False)
     exercices = ExerciceSeanceSerializer(many=True, read_only=True)
@@ -77,6 +154,48 @@ class SeanceEntrainementSerializer(serializers.ModelSerializer):
         ]
 
 
+class SeanceResumeSerializer(ChampsDynamiquesMixin, serializers.Serializer):
+    """
+    Serializer abrégé des séances pour les listes : en-tête et métriques
+    agrégées, sans exercices imbriqués. Alimenté par des lignes values().
+    """
+    CHAMPS = (
+        'id', 'nom', 'mode_entrainement__nom', 'date_prevue', 'date_debut', 'date_fin',
+        'duree_prevue', 'duree_reelle', 'statut', 'note_ressenti', 'note_difficulte',
+        'volume_total', 'tonnage_total', 'nombre_exercices', 'nombre_series_totales',
+        'salle'
+    )
+
+    @classmethod
+    def colonnes(cls, champs=None):
+        """Colonnes values() nécessaires aux champs demandés (id et date_debut servent au curseur)"""
+        if not champs:
+            return cls.CHAMPS
+        sources = {'mode_entrainement': 'mode_entrainement__nom'}
+        demandees = {sources.get(champ, champ) for champ in champs}
+        return tuple(
+            colonne for colonne in cls.CHAMPS
+            if colonne in demandees or colonne in ('id', 'date_debut')
+        )
+
+    id = serializers.IntegerField()
+    nom = serializers.CharField()
+    mode_entrainement = serializers.CharField(source='mode_entrainement__nom', allow_null=True)
+    date_prevue = serializers.DateTimeField()
+    date_debut = serializers.DateTimeField(allow_null=True)
+    date_fin = serializers.DateTimeField(allow_null=True)
+    duree_prevue = serializers.IntegerField()
+    duree_reelle = serializers.IntegerField(allow_null=True)
+    statut = serializers.CharField()
+    note_ressenti = serializers.IntegerField(allow_null=True)
+    note_difficulte = serializers.IntegerField(allow_null=True)
+    volume_total = serializers.FloatField()
+    tonnage_total = serializers.FloatField()
+    nombre_exercices = serializers.IntegerField()
+    nombre_series_totales = serializers.IntegerField()
+    salle = serializers.CharField()
+
+
 class SeanceCreateSerializer(serializers.ModelSerializer):
     """Serializer pour créer une séance simple"""
     exercices_data = serializers.ListField(child=serializers.DictField(), write_only=True)
@@ -89,19 +208,40 @@ class SeanceCreateSerializer(serializers.ModelSerializer):
             'commentaire', 'salle', 'exercices_data'
         ]
 
+    @transaction.atomic
     def create(self, validated_data):
+        """
+        Crée la séance avec ses exercices et séries en trois insertions :
+        les métriques sont calculées en mémoire, puis les exercices et les
+        séries sont insérés par lots (bulk_create n'appelle pas save())
+        """
         exercices_data = validated_data.pop('exercices_data', [])
         validated_data['utilisateur'] = self.context['request'].user
-        seance = SeanceEntrainement.objects.create(**validated_data)
+        seance = SeanceEntrainement(**validated_data)
 
+        exercices = []
+        series = []
         for exercice_data in exercices_data:
+            exercice_data = dict(exercice_data)
             series_data = exercice_data.pop('series', [])
-            exercice = ExerciceSeance.objects.create(seance=seance, **exercice_data)
+            exercice = ExerciceSeance(**exercice_data)
+            series_exercice = [SeriExercice(exercice=exercice, **serie_data) for serie_data in series_data]
+            exercice.calculer_metriques(series_exercice)
+            exercices.append(exercice)
+            series.extend(series_exercice)
+
+        # Métriques enregistrées avec la séance ; son post_save invalide le
+        # cache de l'utilisateur, les insertions par lots n'envoyant pas de signaux
+        seance.calculer_metriques(exercices)
+        seance.save()
 
-            for serie_data in series_data:
-                SeriExercice.objects.create(exercice=exercice, **serie_data)
+        for exercice in exercices:
+            exercice.seance = seance
+        ExerciceSeance.objects.bulk_create(exercices)
+        SeriExercice.objects.bulk_create(series)
 
-        seance.calculer_metriques()
+        if seance.est_terminee:
+            seance.mettre_a_jour_donnees_derivees()
         return seance
 
 
@@ -0,0 +1,102 @@
+"""
+Signaux de l'application workouts
+"""
+import threading
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.core.cache_utilisateur import incrementer_version_utilisateur
+from .models import SeanceEntrainement, ExerciceSeance, SeriExercice, ProgressionMachine
+from .recalcul import recalculer_utilisateur
+
+# Dernière suppression traitée et utilisateurs dont les données sont à reconstruire
+_statistiques_en_attente = threading.local()
+
+
+def _utilisateur_id(instance):
+    """Utilisateur concerné par une écriture, en évitant les requêtes si possible"""
+    if isinstance(instance, (SeanceEntrainement, ProgressionMachine)):
+        return instance.utilisateur_id
+
+    if isinstance(instance, SeriExercice):
+        if not SeriExercice.exercice.is_cached(instance):
+            return SeanceEntrainement.objects.filter(
+                exercices=instance.exercice_id
+            ).values_list('utilisateur_id', flat=True).first()
+        instance = instance.exercice
+
+    if ExerciceSeance.seance.is_cached(instance):
+        return instance.seance.utilisateur_id
+    return SeanceEntrainement.objects.filter(
+        pk=instance.seance_id
+    ).values_list('utilisateur_id', flat=True).first()
+
+
+def _suppression_en_cascade(sender, origine):
+    """
+    Vrai si la suppression découle de celle d'une séance ou d'un exercice
+    parent : le signal du parent invalide déjà le cache, inutile de
+    rechercher l'utilisateur pour chaque ligne supprimée
+    """
+    if origine is None:
+        return False
+    modele = origine.model if isinstance(origine, QuerySet) else type(origine)
+    return modele is not sender and modele in (SeanceEntrainement, ExerciceSeance)
+
+
+@receiver(post_save, sender=SeanceEntrainement)
+@receiver(post_delete, sender=SeanceEntrainement)
+@receiver(post_save, sender=ExerciceSeance)
+@receiver(post_delete, sender=ExerciceSeance)
+@receiver(post_save, sender=SeriExercice)
+@receiver(post_delete, sender=SeriExercice)
+@receiver(post_save, sender=ProgressionMachine)
+@receiver(post_delete, sender=ProgressionMachine)
+def donnees_entrainement_modifiees(sender, instance, **kwargs):
+    """Invalide les réponses en cache de l'utilisateur concerné"""
+    if _suppression_en_cascade(sender, kwargs.get('origin')):
+        return
+    incrementer_version_utilisateur(_utilisateur_id(instance))
+
+
+@receiver(post_save, sender=SeriExercice)
+@receiver(post_delete, sender=SeriExercice)
+def serie_modifiee(sender, instance, **kwargs):
+    """
+    Recalcule les métriques de l'exercice (tonnage, meilleure série, RPE
+    moyen) et les totaux de la séance après l'écriture d'une série
+    """
+    if _suppression_en_cascade(sender, kwargs.get('origin')):
+        return
+    ExerciceSeance.objects.filter(pk=instance.exercice_id).recalculer_metriques_series()
+    SeanceEntrainement.objects.filter(exercices=instance.exercice_id).recalculer_metriques()
+
+
+
+@receiver(post_delete, sender=SeanceEntrainement)
+def seance_supprimee(sender, instance, **kwargs):
+    """
+    Reconstruit les progressions, les statistiques et les agrégats de
+    l'utilisateur après la suppression d'une séance terminée, une fois la
+    transaction validée.
+    Une suppression en masse (queryset.delete()) ne les reconstruit qu'une
+    fois par utilisateur.
+    """
+    origine = kwargs.get('origin')
+    modele = origine.model if isinstance(origine, QuerySet) else type(origine)
+    if not instance.est_terminee or modele is not SeanceEntrainement:
+        # Suppression de l'utilisateur : ses statistiques disparaissent aussi
+        return
+
+    if getattr(_statistiques_en_attente, 'origine', None) is not origine:
+        _statistiques_en_attente.origine = origine
+        _statistiques_en_attente.utilisateur_ids = set()
+    if instance.utilisateur_id in _statistiques_en_attente.utilisateur_ids:
+        return
+    _statistiques_en_attente.utilisateur_ids.add(instance.utilisateur_id)
+
+    utilisateur_id = instance.utilisateur_id
+    transaction.on_commit(lambda: recalculer_utilisateur(utilisateur_id))
@@ -0,0 +1,255 @@
+"""
+Tests des entraînements : nombre de requêtes des chemins critiques et
+cohérence des données dérivées des séances terminées
+"""
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.core.models import ModeEntrainement
+from apps.machines.models import CategorieMachine, Machine
+from apps.users.models import User
+from .models import (
+    AgregatPeriode, ExerciceSeance, ProgressionMachine, SeanceEntrainement, SeriExercice,
+    StatistiquesUtilisateur
+)
+from .serializers import SeanceCreateSerializer
+
+
+class EntrainementTestCase(TestCase):
+    """Une machine, un mode d'entraînement et un utilisateur authentifié"""
+
+    @classmethod
+    def setUpTestData(cls):
+        ModeEntrainement.objects.create(nom='PRISE_MASSE')
+        categorie = CategorieMachine.objects.create(nom='MUSCULATION')
+        cls.machine = Machine.objects.create(
+            nom='Développé couché', description='d', instructions='i', categorie=categorie
+        )
+        cls.utilisateur = User.objects.create_user(
+            username='test@basicfit.fr', email='test@basicfit.fr', password='x',
+            prenom='Test', nom='Basicfit', objectif_sportif='PRISE_MASSE'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.utilisateur)
+
+
+class NombreRequetesTestCase(EntrainementTestCase):
+    """Le nombre de requêtes ne doit pas dépendre du nombre de séances"""
+
+    def creer_seances(self, nombre):
+        """Séances terminées de deux exercices, dont une sur deux excellente"""
+        maintenant = timezone.now()
+        for i in range(nombre):
+            seance = SeanceEntrainement.objects.create(
+                utilisateur=self.utilisateur,
+                nom=f'Séance {i}',
+                date_prevue=maintenant,
+                date_debut=maintenant - timedelta(days=i),
+                statut='TERMINEE'
+            )
+            ExerciceSeance.objects.bulk_create([
+                ExerciceSeance(
+                    seance=seance, machine=self.machine, ordre_dans_seance=ordre, poids_prevu=40,
+                    note_ressenti=9 if i % 2 == 0 else 5
+                )
+                for ordre in (1, 2)
+            ])
+
+    def compter_requetes(self, fonction):
+        with CaptureQueriesContext(connection) as contexte:
+            fonction()
+        return len(contexte.captured_queries)
+
+    def test_seances_excellentes_en_une_requete(self):
+        self.creer_seances(5)
+        seances = SeanceEntrainement.objects.filter(utilisateur=self.utilisateur)
+        with self.assertNumQueries(1):
+            self.assertEqual(seances.nombre_excellentes(), 3)
+
+        self.creer_seances(20)
+        with self.assertNumQueries(1):
+            self.assertEqual(seances.nombre_excellentes(), 3 + 10)
+
+    def test_historique_et_liste_en_nombre_constant(self):
+        urls = [
+            '/api/workouts/seances/',
+            '/api/workouts/seances/?expand=exercices',
+            '/api/workouts/seances/history/?limit=50',
+            '/api/workouts/seances/history/?limit=50&expand=exercices,machine,series',
+        ]
+        self.creer_seances(3)
+        nombres = {url: self.compter_requetes(lambda: self.client.get(url)) for url in urls}
+
+        self.creer_seances(30)
+        for url in urls:
+            with self.subTest(url=url), self.assertNumQueries(nombres[url]):
+                reponse = self.client.get(url)
+            self.assertEqual(reponse.status_code, 200)
+
+    def test_creation_imbriquee_en_nombre_constant(self):
+        """Séance de 10 exercices × 5 séries : une insertion par niveau"""
+        requete = APIRequestFactory().post('/api/workouts/seances/')
+        requete.user = self.utilisateur
+        data = {
+            'nom': 'Push',
+            'date_prevue': timezone.now(),
+            'statut': 'PLANIFIEE',
+            'exercices_data': [
+                {
+                    'machine_id': self.machine.id,
+                    'ordre_dans_seance': ordre,
+                    'poids_prevu': 40,
+                    'series': [
+                        {'numero_serie': numero, 'poids_prevu': 40, 'repetitions_prevues': 10}
+                        for numero in range(1, 6)
+                    ]
+                }
+                for ordre in range(1, 11)
+            ]
+        }
+        serializer = SeanceCreateSerializer(data=data, context={'request': requete})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        # Savepoint, séance, exercices, séries, libération du savepoint
+        with self.assertNumQueries(5):
+            seance = serializer.save()
+        self.assertEqual(seance.exercices.count(), 10)
+        self.assertEqual(SeriExercice.objects.filter(exercice__seance=seance).count(), 50)
+
+
+class DonneesDeriveesTestCase(EntrainementTestCase):
+    """
+    Progressions, statistiques et agrégats suivent les modifications des
+    séances terminées
+    """
+
+    def setUp(self):
+        super().setUp()
+        reponse = self.client.post('/api/workouts/sauvegarder/', {
+            'nom': 'Push', 'duree': 40,
+            'exercices': [{'nom': 'Développé couché', 'series': 3, 'reps': 5, 'poids': 10}]
+        }, format='json')
+        self.assertEqual(reponse.status_code, 201)
+        self.seance = SeanceEntrainement.objects.get(utilisateur=self.utilisateur)
+        self.url = f'/api/workouts/seances/{self.seance.id}/'
+
+    def test_seance_rouverte_puis_terminee(self):
+        progression = ProgressionMachine.objects.get(utilisateur=self.utilisateur)
+        poids_apres_seance = progression.poids_actuel
+
+        self.client.patch(self.url, {'statut': 'EN_COURS'}, format='json')
+        self.assertFalse(ProgressionMachine.objects.filter(utilisateur=self.utilisateur).exists())
+        self.assertEqual(StatistiquesUtilisateur.objects.get(utilisateur=self.utilisateur).total_seances, 0)
+
+        self.client.patch(self.url, {'statut': 'TERMINEE'}, format='json')
+        progression = ProgressionMachine.objects.get(utilisateur=self.utilisateur)
+        self.assertEqual(progression.nombre_seances_machine, 1)
+        self.assertEqual(progression.poids_actuel, poids_apres_seance)
+        self.assertEqual(StatistiquesUtilisateur.objects.get(utilisateur=self.utilisateur).total_seances, 1)
+
+    def agregats(self):
+        return list(AgregatPeriode.objects.filter(
+            utilisateur=self.utilisateur, periode=AgregatPeriode.SEMAINE
+        ).values_list('debut_periode', 'seances', 'tonnage'))
+
+    def test_agregats_seance_rouverte_puis_terminee(self):
+        agregats = self.agregats()
+        self.client.patch(self.url, {'statut': 'EN_COURS'}, format='json')
+        self.assertEqual(self.agregats(), [])
+        self.client.patch(self.url, {'statut': 'TERMINEE'}, format='json')
+        self.assertEqual(self.agregats(), agregats)
+
+    def test_agregats_seance_deplacee(self):
+        date_debut = self.seance.date_debut - timedelta(weeks=2)
+        self.client.patch(self.url, {
+            'date_debut': date_debut, 'date_fin': date_debut + timedelta(minutes=40)
+        }, format='json')
+        debut_semaine = AgregatPeriode.debuts_periodes(timezone.localtime(date_debut).date())[AgregatPeriode.SEMAINE]
+        self.assertEqual([ligne[:2] for ligne in self.agregats()], [(debut_semaine, 1)])
+
+    def test_seance_supprimee(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reponse = self.client.delete(self.url)
+        self.assertEqual(reponse.status_code, 204)
+        self.assertEqual(self.agregats(), [])
+        self.assertEqual(AgregatPeriode.seances_periode_courante(self.utilisateur), 0)
+        self.assertFalse(ProgressionMachine.objects.filter(utilisateur=self.utilisateur).exists())
+        self.assertEqual(StatistiquesUtilisateur.objects.get(utilisateur=self.utilisateur).total_seances, 0)
+
+
+class IngestionTestCase(EntrainementTestCase):
+    """Un élément invalide d'un lot est refusé sans bloquer les autres"""
+
+    def test_elements_hors_bornes(self):
+        elements = [
+            {'cle_client': 'ok', 'duree': 30},
+            {'cle_client': 'duree', 'duree': 10 ** 10},
+            {'cle_client': 'date', 'date_debut': '9999-12-31T23:59:00+00:00'},
+            {'cle_client': 'series', 'exercices': [{'nom': 'Développé couché', 'series': 20000}]},
+            {'cle_client': 'reps', 'exercices': [{'nom': 'Développé couché', 'reps': 2 ** 40}]},
+            {'cle_client': 'exercices', 'exercices': [{'nom': 'Développé couché'}] * 51},
+        ]
+        reponse = self.client.post('/api/workouts/sauvegarder/batch/', elements, format='json')
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual(
+            [resultat['statut'] for resultat in reponse.data['resultats']],
+            ['CREEE'] + ['INVALIDE'] * 5
+        )
+        self.assertEqual(SeriExercice.objects.count(), 0)
+
+
+class ParametresTestCase(EntrainementTestCase):
+    """Un paramètre de requête invalide donne une erreur 400"""
+
+    def test_historique(self):
+        for parametres in ({'limit': 'abc'}, {'cursor': 'abc'}):
+            with self.subTest(parametres=parametres):
+                reponse = self.client.get('/api/workouts/seances/history/', parametres)
+                self.assertEqual(reponse.status_code, 400)
+
+
+class MetriquesSeriesTestCase(EntrainementTestCase):
+    """Le recalcul par lots (colonnes NumPy) donne les métriques du calcul ligne à ligne"""
+
+    def test_recalcul_par_lots(self):
+        seance = SeanceEntrainement.objects.create(
+            utilisateur=self.utilisateur, nom='Push', date_prevue=timezone.now()
+        )
+        exercices = ExerciceSeance.objects.bulk_create([
+            ExerciceSeance(
+                seance=seance, machine=self.machine, ordre_dans_seance=ordre, poids_prevu=40,
+                nombre_series=3, repetitions_realisees=8, poids_utilise=poids
+            )
+            for ordre, poids in enumerate((40.0, None, 60.0), start=1)
+        ])
+        series = {
+            exercices[0]: [(40.0, 10, 7), (None, 12, None), (50.0, 5, 9)],
+            exercices[1]: [(20.0, 0, 6), (30.0, 8, 8), (30.0, 8, None)],
+            exercices[2]: [],
+        }
+        SeriExercice.objects.bulk_create([
+            SeriExercice(
+                exercice=exercice, numero_serie=numero, repetitions_prevues=8, poids_prevu=40,
+                poids_utilise=poids, repetitions_realisees=repetitions, note_effort=effort
+            )
+            for exercice, lignes in series.items()
+            for numero, (poids, repetitions, effort) in enumerate(lignes, start=1)
+        ])
+
+        attendues = {}
+        for exercice in ExerciceSeance.objects.filter(seance=seance):
+            exercice.calculer_metriques(list(exercice.series.order_by('numero_serie')))
+            attendues[exercice.pk] = [getattr(exercice, champ) for champ in ExerciceSeance.CHAMPS_METRIQUES]
+
+        ExerciceSeance.objects.filter(seance=seance).recalculer_metriques_series()
+        self.assertEqual({
+            exercice.pk: [getattr(exercice, champ) for champ in ExerciceSeance.CHAMPS_METRIQUES]
+            for exercice in ExerciceSeance.objects.filter(seance=seance)
+        }, attendues)
@@ -16,6 +16,12 @@ urlpatterns = [
 
     # Endpoints spéciaux
     path('sauvegarder/', views.sauvegarder_seance_simple, name='sauvegarder-seance'),
+    path('sauvegarder/batch/', views.sauvegarder_seances_lot, name='sauvegarder-seances-lot'),
+    path(
+        'progression/<int:machine_id>/series/',
+        views.progression_series,
+        name='progression-series'
+    ),
 
     # Compatibilité/démo
     path('info/', views.workouts_info, name='workouts-info'),
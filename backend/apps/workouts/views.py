@@ -1,24 +1,43 @@
 """
 API REST pour les séances d'entraînement
 """
-from django.db.models import Sum, Count, Max, Avg
+from django.db.models import Prefetch, prefetch_related_objects
+from django.core.exceptions import ValidationError
+from django.http import Http404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from django.utils import timezone
-from datetime import timedelta
 
-from .models import SeanceEntrainement, ExerciceSeance, SeriExercice, ProgressionMachine
+from .models import (
+    SeanceEntrainement, ExerciceSeance, SeriExercice,
+    StatistiquesUtilisateur, AgregatBase, AgregatPeriode, AgregatGroupeMusculaire
+)
 from .serializers import (
-    SeanceEntrainementSerializer, SeanceCreateSerializer,
+    SeanceEntrainementSerializer, SeanceResumeSerializer, SeanceCreateSerializer,
     ExerciceSeanceSerializer, SeriExerciceSerializer,
     ProgressionMachineSerializer, WorkoutStatsSerializer,
-    MachineSerializer
+    MachineSerializer, EXPANSIONS_SEANCE, options_affichage
+)
+from .analyses import (
+    ColonnesSeries, PERIODES, resume_par_machine, serie_temporelle, sous_echantillonner
 )
+from .ingestion import (
+    TAILLE_MAX_LOT, CREEE, DOUBLON, INVALIDE, enregistrer_seance_android, enregistrer_seances_android
+)
+from .serialisation_rapide import serialiser_seances
+from .pagination import ORDRE_HISTORIQUE, encoder_curseur, page_historique
+from .recalcul import recalculer_utilisateur
+from apps.core.cache_utilisateur import en_cache_utilisateur
+from apps.core.idempotence import executer_idempotent, idempotent
+from apps.core.renderers import reponse_json_en_flux
 from apps.machines.models import Machine
 
 
+# Nombre de séances sérialisées par lot dans l'export en flux
+TAILLE_LOT_EXPORT = 200
+
+
 class SeanceEntrainementViewSet(viewsets.ModelViewSet):
     """ViewSet pour les séances d'entraînement"""
     permission_classes = [IsAuthenticated]
@@ -26,84 +45,254 @@ class SeanceEntrainementViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == 'create':
             return SeanceCreateSerializer
+        if self.action in ('list', 'history') and 'expand' not in self.request.query_params:
+            return SeanceResumeSerializer
         return SeanceEntrainementSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['champs'], context['expand'] = options_affichage(self.request.query_params)
+        return context
+
     def get_queryset(self):
-        return SeanceEntrainement.objects.filter(
+        seances = SeanceEntrainement.objects.filter(
             utilisateur=self.request.user
-        ).prefetch_related('exercices__machine', 'exercices__series').order_by('-date_debut')
+        ).order_by(*ORDRE_HISTORIQUE)
+        champs, expand = options_affichage(self.request.query_params)
+
+        if self.get_serializer_class() is SeanceResumeSerializer:
+            # Listes : lignes plates, sans exercices imbriqués
+            return seances.values(*SeanceResumeSerializer.colonnes(champs))
+        return self._construire_queryset(seances, champs, expand)
+
+    def _construire_queryset(self, seances, champs, expand):
+        """
+        Ne charge que ce que la réponse contient : colonnes demandées et
+        relations développées
+        """
+        if expand is None:
+            expand = EXPANSIONS_SEANCE
+
+        if champs and self.request.method == 'GET':
+            colonnes = {
+                champ.name for champ in SeanceEntrainement._meta.concrete_fields
+            } & champs
+            seances = seances.only('id', 'date_debut', *colonnes)
+
+        if not champs or 'mode_entrainement' in champs:
+            seances = seances.select_related('mode_entrainement')
+
+        if 'exercices' in expand and (not champs or 'exercices' in champs):
+            exercices = ExerciceSeance.objects.select_related('variante')
+            if 'machine' in expand:
+                exercices = exercices.select_related('machine').prefetch_related(
+                    'machine__groupes_musculaires_primaires'
+                )
+            if 'series' in expand:
+                exercices = exercices.prefetch_related('series')
+            seances = seances.prefetch_related(Prefetch('exercices', queryset=exercices))
+
+        return seances
+
+    def _rendu_rapide(self):
+        """
+        Vrai si la réponse est la représentation complète des séances, que
+        serialiser_seances produit sans passer par les serializers
+        """
+        champs, expand = options_affichage(self.request.query_params)
+        return (
+            self.get_serializer_class() is SeanceEntrainementSerializer
+            and champs is None
+            and (expand is None or expand == EXPANSIONS_SEANCE)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self._rendu_rapide():
+            return super().retrieve(request, *args, **kwargs)
+
+        try:
+            seances = SeanceEntrainement.objects.filter(utilisateur=request.user, pk=kwargs['pk'])
+            data = serialiser_seances(seances)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if not data:
+            raise Http404
+        return Response(data[0])
+
+    def perform_update(self, serializer):
+        etait_terminee = serializer.instance.est_terminee
+        seance = serializer.save()
+        if seance.est_terminee and not etait_terminee:
+            seance.mettre_a_jour_donnees_derivees()
+        elif etait_terminee:
+            # Séance terminée modifiée : données dérivées reconstruites depuis l'historique
+            recalculer_utilisateur(seance.utilisateur_id)
+
+    def create(self, request, *args, **kwargs):
+        # Une création répétée avec le même Idempotency-Key rejoue la première réponse
+        creer = super().create
+        return executer_idempotent(request, lambda: creer(request, *args, **kwargs))
+
+    def list(self, request, *args, **kwargs):
+        if not self._rendu_rapide():
+            return super().list(request, *args, **kwargs)
+
+        seances = SeanceEntrainement.objects.filter(
+            utilisateur=request.user
+        ).order_by(*ORDRE_HISTORIQUE)
+        page = self.paginate_queryset(seances.values_list('id', flat=True))
+        if page is not None:
+            return self.get_paginated_response(serialiser_seances(seances.filter(id__in=page)))
+        return Response(serialiser_seances(seances))
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Statistiques de l'utilisateur"""
-        user = request.user
-        seances = SeanceEntrainement.objects.filter(utilisateur=user, statut='TERMINEE')
+        return Response(en_cache_utilisateur(
+            request.user.pk, 'workouts:stats',
+            lambda: dict(WorkoutStatsSerializer(StatistiquesUtilisateur.pour_utilisateur(request.user)).data)
+        ))
 
-        # Calculs des stats
-        total_seances = seances.count()
-        total_minutes = seances.aggregate(
-            total=Sum('duree_reelle')
-        )['total'] or 0
+    @action(detail=False, methods=['get'])
+    def durees(self, request):
+        """Durées des séances terminées (total, moyenne, histogramme)"""
+        try:
+            tranche = int(request.query_params.get('tranche', 15))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if tranche < 1:
+            return Response(
+                {'error': "tranche doit être un nombre de minutes positif"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        seances = SeanceEntrainement.objects.filter(
+            utilisateur=request.user, statut='TERMINEE'
+        )
+        durees = seances.statistiques_durees()
 
-        # Estimation calories (approximative : 5 cal/min)
-        total_calories = int(total_minutes * 5)
+        return Response({
+            'total_minutes': durees['total'] or 0,
+            'duree_moyenne': round(durees['moyenne'] or 0.0, 1),
+            'duree_maximale': durees['maximum'] or 0,
+            'tranche_minutes': tranche,
+            'histogramme': [
+                {'duree_min': ligne['tranche_duree'], 'nombre': ligne['nombre']}
+                for ligne in seances.histogramme_durees(tranche)
+            ]
+        })
 
-        # Séances excellentes (plus de 80% des exercices réussis)
-        seances_excellentes = 0
-        for seance in seances:
-            exercices = seance.exercices.all()
-            if exercices.count() > 0:
-                excellents = exercices.filter(note_ressenti__gte=8).count()
-                if excellents / exercices.count() >= 0.8:
-                    seances_excellentes += 1
-
-        # Record de poids
-        record_poids = ExerciceSeance.objects.filter(
-            seance__utilisateur=user
-        ).aggregate(Max('poids_utilise'))['poids_utilise__max'] or 0.0
-
-        # Exercices favoris (top 3)
-        exercices_favoris = list(
-            ExerciceSeance.objects.filter(seance__utilisateur=user)
-            .values('machine__nom')
-            .annotate(count=Count('id'))
-            .order_by('-count')[:3]
-            .values_list('machine__nom', flat=True)
+    @action(detail=False, methods=['get'])
+    def agregats(self, request):
+        """
+        Cumuls des dernières semaines ou des derniers mois (séances, minutes,
+        séries, volume, tonnage), avec le détail par groupe musculaire
+        """
+        periodes = {'semaine': AgregatBase.SEMAINE, 'mois': AgregatBase.MOIS}
+        periode = periodes.get(request.query_params.get('periode', 'semaine'))
+        if periode is None:
+            return Response(
+                {'error': "Période inconnue (semaine ou mois)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            nombre = min(max(int(request.query_params.get('nombre', 12)), 1), 104)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        agregats = list(
+            AgregatPeriode.objects.filter(utilisateur=request.user, periode=periode)
+            .order_by('-debut_periode')[:nombre]
+            .values('debut_periode', 'seances', 'minutes', 'exercices', 'series', 'volume', 'tonnage')
         )
+        groupes = {}
+        for ligne in AgregatGroupeMusculaire.objects.filter(
+            utilisateur=request.user, periode=periode,
+            debut_periode__in=[agregat['debut_periode'] for agregat in agregats]
+        ).values('debut_periode', 'groupe_musculaire__nom', 'series', 'volume', 'tonnage').order_by('-tonnage'):
+            groupes.setdefault(ligne.pop('debut_periode'), []).append({
+                'groupe_musculaire': ligne.pop('groupe_musculaire__nom'), **ligne
+            })
 
-        # Progression générale (moyenne des progressions)
-        progression_generale = ProgressionMachine.objects.filter(
-            utilisateur=user
-        ).aggregate(Avg('progression_poids_total'))['progression_poids_total__avg'] or 0.0
+        return Response({
+            'periode': request.query_params.get('periode', 'semaine'),
+            'resultats': [
+                {**agregat, 'groupes_musculaires': groupes.get(agregat['debut_periode'], [])}
+                for agregat in agregats
+            ]
+        })
 
-        stats_data = {
-            'total_seances': total_seances,
-            'total_minutes': int(total_minutes),
-            'total_calories': total_calories,
-            'seances_excellentes': seances_excellentes,
-            'record_poids': float(record_poids),
-            'exercices_favoris': exercices_favoris,
-            'progression_generale': float(progression_generale)
-        }
+    @action(detail=False, methods=['get'])
+    def analyses(self, request):
+        """Indicateurs par machine (1RM, tonnage, volume, records) calculés sur toutes les séries"""
+        resume = resume_par_machine(ColonnesSeries.pour_utilisateur(request.user))
+        noms = dict(Machine.objects.filter(
+            id__in=[ligne['machine_id'] for ligne in resume]
+        ).values_list('id', 'nom'))
 
-        serializer = WorkoutStatsSerializer(stats_data)
-        return Response(serializer.data)
+        return Response({
+            'machines': [{'machine': noms.get(ligne['machine_id']), **ligne} for ligne in resume]
+        })
 
     @action(detail=False, methods=['get'])
     def history(self, request):
-        """Historique des séances avec pagination"""
-        limit = int(request.query_params.get('limit', 20))
-        offset = int(request.query_params.get('offset', 0))
-
-        seances = self.get_queryset()[offset:offset + limit]
-        serializer = self.get_serializer(seances, many=True)
+        """Historique des séances avec pagination par curseur"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        curseur = request.query_params.get('cursor')
+
+        seances = self.get_queryset()
+        rendu_rapide = self._rendu_rapide()
+        if rendu_rapide:
+            # Représentation complète : la page est lue sans préchargement
+            seances = seances.prefetch_related(None).values('id', 'date_debut')
+        try:
+            page = page_historique(seances, curseur, limit + 1)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        if rendu_rapide:
+            resultats = serialiser_seances(
+                SeanceEntrainement.objects.filter(
+                    id__in=[ligne['id'] for ligne in page]
+                ).order_by(*ORDRE_HISTORIQUE)
+            )
+        else:
+            resultats = self.get_serializer(page, many=True).data
 
         return Response({
-            'results': serializer.data,
-            'count': len(serializer.data),
-            'has_more': len(seances) == limit
+            'results': resultats,
+            'count': len(page),
+            'has_more': has_more,
+            'next_cursor': self._curseur_suivant(page[-1]) if has_more else None
         })
 
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Export complet des séances de l'utilisateur, envoyé en flux par lots
+        pour que la mémoire utilisée ne dépende pas du nombre de séances
+        """
+        seances = SeanceEntrainement.objects.filter(
+            utilisateur=request.user
+        ).order_by(*ORDRE_HISTORIQUE)
+        ids = list(seances.values_list('id', flat=True))
+
+        def lots():
+            for debut in range(0, len(ids), TAILLE_LOT_EXPORT):
+                yield serialiser_seances(seances.filter(id__in=ids[debut:debut + TAILLE_LOT_EXPORT]))
+
+        return reponse_json_en_flux(lots())
+
+    def _curseur_suivant(self, derniere):
+        """Curseur désignant la dernière séance de la page (ligne values() ou instance)"""
+        if isinstance(derniere, dict):
+            return encoder_curseur(derniere['date_debut'], derniere['id'])
+        return encoder_curseur(derniere.date_debut, derniere.id)
+
     @action(detail=True, methods=['post'])
     def commencer(self, request, pk=None):
         """Commencer une séance"""
@@ -136,70 +325,111 @@ class MachineViewSet(viewsets.ReadOnlyModelViewSet):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def sauvegarder_seance_simple(request):
     """Endpoint simplifié pour sauvegarder une séance depuis l'app Android"""
     try:
-        data = request.data
-        user = request.user
-
-        # Créer la séance
-        seance = SeanceEntrainement.objects.create(
-            utilisateur=user,
-            nom=data.get('nom', f"Séance du {timezone.now().strftime('%d/%m/%Y')}"),
-            date_debut=timezone.now() - timedelta(minutes=data.get('duree', 45)),
-            date_fin=timezone.now(),
-            duree_prevue=data.get('duree', 45),
-            statut='TERMINEE',
-            note_ressenti=data.get('note_ressenti', 7),
-            commentaire=data.get('commentaire', '')
+        seance = enregistrer_seance_android(request.user, request.data)
+        prefetch_related_objects(
+            [seance], 'exercices__machine__groupes_musculaires_primaires', 'exercices__series'
         )
 
-        # Ajouter les exercices
-        for idx, exercice_data in enumerate(data.get('exercices', [])):
-            # Récupérer la machine par nom
-            try:
-                machine = Machine.objects.get(nom__icontains=exercice_data['nom'])
-            except Machine.DoesNotExist:
-                # Créer une machine basique si elle n'existe pas
-                machine = Machine.objects.create(
-                    nom=exercice_data['nom'],
-                    groupe_musculaire='Général'
-                )
-
-            exercice = ExerciceSeance.objects.create(
-                seance=seance,
-                machine=machine,
-                ordre_dans_seance=idx + 1,
-                series_prevues=exercice_data.get('series', 3),
-                repetitions_prevues=exercice_data.get('reps', 10),
-                poids_prevu=exercice_data.get('poids', 20),
-                nombre_series=exercice_data.get('series', 3),
-                repetitions_realisees=exercice_data.get('reps', 10),
-                poids_utilise=exercice_data.get('poids', 20),
-                statut='TERMINE'
-            )
+        serializer = SeanceEntrainementSerializer(seance)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            # Ajouter les séries
-            for serie_num in range(exercice_data.get('series', 3)):
-                SeriExercice.objects.create(
-                    exercice=exercice,
-                    numero_serie=serie_num + 1,
-                    repetitions_prevues=exercice_data.get('reps', 10),
-                    poids_prevu=exercice_data.get('poids', 20),
-                    repetitions_realisees=exercice_data.get('reps', 10),
-                    poids_utilise=exercice_data.get('poids', 20),
-                    statut='REUSSIE'
-                )
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Calculer les métriques
-        seance.calculer_metriques()
 
-        serializer = SeanceEntrainementSerializer(seance)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def sauvegarder_seances_lot(request):
+    """
+    Synchronisation hors ligne : enregistre une liste de séances en une
+    requête, avec un résultat par séance (créée, doublon ou invalide)
+    """
+    elements = request.data.get('seances') if isinstance(request.data, dict) else request.data
+    if not isinstance(elements, list):
+        return Response(
+            {'error': 'Une liste de séances est attendue'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if len(elements) > TAILLE_MAX_LOT:
+        return Response(
+            {'error': f'Au plus {TAILLE_MAX_LOT} séances par lot'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
+    try:
+        resultats = enregistrer_seances_android(request.user, elements)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    reponse = []
+    for index, (data, resultat) in enumerate(zip(elements, resultats)):
+        element = {
+            'index': index,
+            'cle_client': data.get('cle_client') if isinstance(data, dict) else None,
+            'statut': resultat['statut'],
+        }
+        if resultat['seance'] is not None:
+            element['id'] = resultat['seance'].id
+        if resultat['erreur']:
+            element['erreur'] = resultat['erreur']
+        reponse.append(element)
+
+    nombres = {statut: 0 for statut in (CREEE, DOUBLON, INVALIDE)}
+    for resultat in resultats:
+        nombres[resultat['statut']] += 1
+
+    return Response({
+        'creees': nombres[CREEE],
+        'doublons': nombres[DOUBLON],
+        'invalides': nombres[INVALIDE],
+        'resultats': reponse
+    }, status=status.HTTP_201_CREATED if nombres[CREEE] else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def progression_series(request, machine_id):
+    """
+    Évolution sur une machine (1RM estimé, série la plus lourde, volume,
+    tonnage) par jour, semaine ou mois, limitée à ?points= points
+    """
+    periode = request.query_params.get('periode', 'semaine')
+    if periode not in PERIODES:
+        return Response(
+            {'error': f"Période inconnue : {periode} (jour, semaine ou mois)"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        nombre_points = min(max(int(request.query_params.get('points', 100)), 1), 1000)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    machine = Machine.objects.filter(pk=machine_id).values('id', 'nom').first()
+    if machine is None:
+        return Response({'error': 'Machine introuvable'}, status=status.HTTP_404_NOT_FOUND)
+
+    points = sous_echantillonner(serie_temporelle(request.user, machine_id, periode), nombre_points)
+    return Response({
+        'machine': machine,
+        'periode': periode,
+        'points': [
+            {
+                'date': point['date'].date().isoformat(),
+                'meilleur_1rm': round(point['meilleur_1rm'], 2) if point['meilleur_1rm'] is not None else None,
+                'serie_max': point['serie_max'],
+                'volume': point['volume'],
+                'tonnage': round(point['tonnage'] or 0.0, 2),
+                'series': point['series'],
+            }
+            for point in points
+        ]
+    })
+
 
 # Vues de compatibilité (pour les tests)
 @api_view(['GET'])